@@ -18,6 +18,9 @@ LOGS_DIR.mkdir(exist_ok=True)
 MIN_TEXT_LENGTH = 100  # Minimum text length to consider PDF as text-based
 OCR_DPI = 300  # DPI for OCR processing
 MAX_PAGES_PER_BATCH = 50  # Process PDFs in batches to manage memory
+# Text-layer backend: "pdfplumber" (column-aware layout) or "pdfium"
+# (pypdfium2, much faster plain text extraction without column handling)
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pdfplumber")
 
 # Text Cleaning Settings
 MIN_LINE_LENGTH = 3  # Minimum characters in a line to keep
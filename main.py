@@ -3,7 +3,7 @@ Main orchestration script for the PDF processing pipeline.
 """
 import logging
 import sys
-import json
+import orjson
 from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
@@ -237,8 +237,8 @@ def process_single_pdf(pdf_path: Path) -> Dict[str, Any]:
         }
         
         json_path = output_path / "metadata.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         # Step 6: Extract MD&A and Letter to Stakeholders sections
         logger.info("Step 6/6: Extracting narrative sections...")
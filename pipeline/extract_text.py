@@ -2,16 +2,19 @@
 Module for extracting text from PDFs (both text-based and scanned).
 """
 import logging
+import statistics
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import io
+from contextlib import nullcontext
 
 import pdfplumber
+import pypdfium2 as pdfium
 import fitz  # PyMuPDF
 from PIL import Image
 import pytesseract
 
-from config.config import OCR_DPI
+from config.config import OCR_DPI, PDF_BACKEND
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +29,88 @@ class PageText:
         self.char_count = len(text)
 
 
-def extract_text_from_text_pdf(pdf_path: Path) -> List[PageText]:
+def _calculate_extraction_stats(pages: List[PageText]) -> dict:
+    """
+    Calculate extraction statistics shared by all extraction backends.
+    
+    Args:
+        pages: Extracted PageText objects
+        
+    Returns:
+        Extraction statistics dict
+    """
+    char_counts = [len(p.text) for p in pages]
+    stripped_counts = [len(p.text.strip()) for p in pages]
+    
+    # Categorize pages by content quality
+    empty_pages = sum(1 for c in stripped_counts if c == 0)
+    low_content_pages = sum(1 for c in stripped_counts if 0 < c <= 100)
+    moderate_content_pages = sum(1 for c in stripped_counts if 100 < c <= 1000)
+    good_content_pages = sum(1 for c in stripped_counts if c > 1000)
+    
+    total_chars = sum(char_counts)
+    pages_with_content = sum(1 for c in stripped_counts if c > 50)
+    
+    # Calculate statistical measures
+    non_empty_counts = [c for c in stripped_counts if c > 0]
+    
+    extraction_stats = {
+        "total_pages_in_pdf": len(pages),
+        "pages_extracted": len(pages),
+        "pages_with_content": pages_with_content,
+        "total_characters": total_chars,
+        "avg_chars_per_page": total_chars / len(pages) if pages else 0,
+        "extraction_coverage": (pages_with_content / len(pages) * 100) if pages else 0,
+        "page_quality_distribution": {
+            "empty_pages": empty_pages,
+            "low_content_pages": low_content_pages,  # 1-100 chars
+            "moderate_content_pages": moderate_content_pages,  # 101-1000 chars
+            "good_content_pages": good_content_pages  # >1000 chars
+        },
+        "character_statistics": {
+            "min_chars_per_page": min(stripped_counts) if stripped_counts else 0,
+            "max_chars_per_page": max(stripped_counts) if stripped_counts else 0,
+            "median_chars_per_page": statistics.median(non_empty_counts) if non_empty_counts else 0,
+            "std_dev_chars_per_page": round(statistics.stdev(non_empty_counts), 2) if len(non_empty_counts) > 1 else 0
+        },
+        "potential_issues": {
+            "empty_or_failed_pages": empty_pages,
+            "suspiciously_low_content": low_content_pages,
+            "page_numbers_with_low_content": [p.page_number for p in pages if 0 < len(p.text.strip()) <= 100]
+        }
+    }
+    
+    return extraction_stats
+
+
+def _log_extraction_stats(extraction_stats: dict) -> None:
+    """Log the character totals, coverage and page quality from extraction stats."""
+    quality = extraction_stats["page_quality_distribution"]
+    logger.info(f"Total characters: {extraction_stats['total_characters']:,}")
+    logger.info(
+        f"Pages with content: {extraction_stats['pages_with_content']}/{extraction_stats['pages_extracted']} "
+        f"({extraction_stats['extraction_coverage']:.1f}%)"
+    )
+    logger.info(
+        f"Quality: Empty={quality['empty_pages']}, Low={quality['low_content_pages']}, "
+        f"Moderate={quality['moderate_content_pages']}, Good={quality['good_content_pages']}"
+    )
+
+
+def extract_text_from_text_pdf(
+    pdf_path: Path,
+    pdf: Optional[pdfplumber.PDF] = None,
+    page_range: Optional[Tuple[int, int]] = None
+) -> List[PageText]:
     """
     Extract text from a text-based PDF using pdfplumber with proper column handling.
     
     Args:
         pdf_path: Path to the PDF file
+        pdf: Already-open pdfplumber document to reuse (left open); if None,
+            pdf_path is opened and closed here
+        page_range: Optional (first, last) page numbers, 1-indexed and
+            inclusive; pages outside it are not extracted
         
     Returns:
         List of PageText objects containing extracted text for each page
@@ -40,8 +119,11 @@ def extract_text_from_text_pdf(pdf_path: Path) -> List[PageText]:
     pages = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with (nullcontext(pdf) if pdf is not None else pdfplumber.open(pdf_path)) as pdf:
             for i, page in enumerate(pdf.pages):
+                if page_range and not page_range[0] <= i + 1 <= page_range[1]:
+                    continue
+                
                 try:
                     # Try to detect and handle multi-column layouts
                     text = extract_text_with_column_detection(page)
@@ -78,53 +160,10 @@ def extract_text_from_text_pdf(pdf_path: Path) -> List[PageText]:
         # Fallback to PyMuPDF
         return extract_text_with_pymupdf(pdf_path)
     
-    # Calculate extraction statistics with detailed metrics
-    char_counts = [len(p.text) for p in pages]
-    stripped_counts = [len(p.text.strip()) for p in pages]
-    
-    # Categorize pages by content quality
-    empty_pages = sum(1 for c in stripped_counts if c == 0)
-    low_content_pages = sum(1 for c in stripped_counts if 0 < c <= 100)
-    moderate_content_pages = sum(1 for c in stripped_counts if 100 < c <= 1000)
-    good_content_pages = sum(1 for c in stripped_counts if c > 1000)
-    
-    total_chars = sum(char_counts)
-    pages_with_content = sum(1 for c in stripped_counts if c > 50)
-    
-    # Calculate statistical measures
-    import statistics
-    non_empty_counts = [c for c in stripped_counts if c > 0]
-    
-    extraction_stats = {
-        "total_pages_in_pdf": len(pages),
-        "pages_extracted": len(pages),
-        "pages_with_content": pages_with_content,
-        "total_characters": total_chars,
-        "avg_chars_per_page": total_chars / len(pages) if pages else 0,
-        "extraction_coverage": (pages_with_content / len(pages) * 100) if pages else 0,
-        "page_quality_distribution": {
-            "empty_pages": empty_pages,
-            "low_content_pages": low_content_pages,  # 1-100 chars
-            "moderate_content_pages": moderate_content_pages,  # 101-1000 chars
-            "good_content_pages": good_content_pages  # >1000 chars
-        },
-        "character_statistics": {
-            "min_chars_per_page": min(stripped_counts) if stripped_counts else 0,
-            "max_chars_per_page": max(stripped_counts) if stripped_counts else 0,
-            "median_chars_per_page": statistics.median(non_empty_counts) if non_empty_counts else 0,
-            "std_dev_chars_per_page": round(statistics.stdev(non_empty_counts), 2) if len(non_empty_counts) > 1 else 0
-        },
-        "potential_issues": {
-            "empty_or_failed_pages": empty_pages,
-            "suspiciously_low_content": low_content_pages,
-            "page_numbers_with_low_content": [p.page_number for p in pages if 0 < len(p.text.strip()) <= 100]
-        }
-    }
+    extraction_stats = _calculate_extraction_stats(pages)
     
     logger.info(f"Extracted text from {len(pages)} pages")
-    logger.info(f"Total characters: {total_chars:,}")
-    logger.info(f"Pages with content: {pages_with_content}/{len(pages)} ({extraction_stats['extraction_coverage']:.1f}%)")
-    logger.info(f"Quality: Empty={empty_pages}, Low={low_content_pages}, Moderate={moderate_content_pages}, Good={good_content_pages}")
+    _log_extraction_stats(extraction_stats)
     
     return pages, extraction_stats
 
@@ -312,48 +351,72 @@ def extract_text_with_pymupdf(pdf_path: Path) -> List[PageText]:
     except Exception as e:
         logger.error(f"Error with PyMuPDF fallback: {e}")
     
-    # Calculate extraction statistics with detailed metrics
-    char_counts = [len(p.text) for p in pages]
-    stripped_counts = [len(p.text.strip()) for p in pages]
+    extraction_stats = _calculate_extraction_stats(pages)
     
-    # Categorize pages by content quality
-    empty_pages = sum(1 for c in stripped_counts if c == 0)
-    low_content_pages = sum(1 for c in stripped_counts if 0 < c <= 100)
-    moderate_content_pages = sum(1 for c in stripped_counts if 100 < c <= 1000)
-    good_content_pages = sum(1 for c in stripped_counts if c > 1000)
+    return pages, extraction_stats
+
+
+def extract_text_with_pdfium(
+    pdf_path: Path,
+    page_range: Optional[Tuple[int, int]] = None
+) -> List[PageText]:
+    """
+    Extract the text layer with pypdfium2 (PDFium), without column detection.
     
-    total_chars = sum(char_counts)
-    pages_with_content = sum(1 for c in stripped_counts if c > 50)
+    Much faster than pdfplumber's character-level layout analysis; used
+    when PDF_BACKEND is "pdfium".
     
-    # Calculate statistical measures
-    import statistics
-    non_empty_counts = [c for c in stripped_counts if c > 0]
+    Args:
+        pdf_path: Path to the PDF file
+        page_range: Optional (first, last) page numbers, 1-indexed and
+            inclusive; pages outside it are not extracted
+        
+    Returns:
+        List of PageText objects
+    """
+    logger.info(f"Extracting text with pypdfium2: {pdf_path.name}")
+    pages = []
     
-    extraction_stats = {
-        "total_pages_in_pdf": len(pages),
-        "pages_extracted": len(pages),
-        "pages_with_content": pages_with_content,
-        "total_characters": total_chars,
-        "avg_chars_per_page": total_chars / len(pages) if pages else 0,
-        "extraction_coverage": (pages_with_content / len(pages) * 100) if pages else 0,
-        "page_quality_distribution": {
-            "empty_pages": empty_pages,
-            "low_content_pages": low_content_pages,
-            "moderate_content_pages": moderate_content_pages,
-            "good_content_pages": good_content_pages
-        },
-        "character_statistics": {
-            "min_chars_per_page": min(stripped_counts) if stripped_counts else 0,
-            "max_chars_per_page": max(stripped_counts) if stripped_counts else 0,
-            "median_chars_per_page": statistics.median(non_empty_counts) if non_empty_counts else 0,
-            "std_dev_chars_per_page": round(statistics.stdev(non_empty_counts), 2) if len(non_empty_counts) > 1 else 0
-        },
-        "potential_issues": {
-            "empty_or_failed_pages": empty_pages,
-            "suspiciously_low_content": low_content_pages,
-            "page_numbers_with_low_content": [p.page_number for p in pages if 0 < len(p.text.strip()) <= 100]
-        }
-    }
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+    except Exception as e:
+        logger.error(f"Error opening PDF with pypdfium2: {e}")
+        # Fall back to the pdfplumber backend
+        return extract_text_from_text_pdf(pdf_path, page_range=page_range)
+    
+    try:
+        for page_num in range(len(pdf)):
+            if page_range and not page_range[0] <= page_num + 1 <= page_range[1]:
+                continue
+            
+            try:
+                page = pdf[page_num]
+                textpage = page.get_textpage()
+                # PDFium separates lines with CRLF and marks hyphenation
+                # breaks with U+FFFE (not valid in XML/DOCX output)
+                text = textpage.get_text_range().replace("\r\n", "\n").replace("\ufffe", "")
+                textpage.close()
+                page.close()
+                
+                pages.append(PageText(
+                    page_number=page_num + 1,
+                    text=text,
+                    method='direct'
+                ))
+            except Exception as e:
+                logger.error(f"Error extracting text from page {page_num+1}: {e}")
+                pages.append(PageText(
+                    page_number=page_num + 1,
+                    text="",
+                    method='direct'
+                ))
+    finally:
+        pdf.close()
+    
+    extraction_stats = _calculate_extraction_stats(pages)
+    
+    logger.info(f"Extracted text from {len(pages)} pages")
+    _log_extraction_stats(extraction_stats)
     
     return pages, extraction_stats
 
@@ -410,72 +473,43 @@ def extract_text_from_scanned_pdf(pdf_path: Path, dpi: int = OCR_DPI) -> List[Pa
     except Exception as e:
         logger.error(f"Error during OCR extraction: {e}")
     
-    # Calculate extraction statistics with detailed metrics
-    char_counts = [len(p.text) for p in pages]
-    stripped_counts = [len(p.text.strip()) for p in pages]
-    
-    # Categorize pages by content quality
-    empty_pages = sum(1 for c in stripped_counts if c == 0)
-    low_content_pages = sum(1 for c in stripped_counts if 0 < c <= 100)
-    moderate_content_pages = sum(1 for c in stripped_counts if 100 < c <= 1000)
-    good_content_pages = sum(1 for c in stripped_counts if c > 1000)
-    
-    total_chars = sum(char_counts)
-    pages_with_content = sum(1 for c in stripped_counts if c > 50)
-    
-    # Calculate statistical measures
-    import statistics
-    non_empty_counts = [c for c in stripped_counts if c > 0]
-    
-    extraction_stats = {
-        "total_pages_in_pdf": len(pages),
-        "pages_extracted": len(pages),
-        "pages_with_content": pages_with_content,
-        "total_characters": total_chars,
-        "avg_chars_per_page": total_chars / len(pages) if pages else 0,
-        "extraction_coverage": (pages_with_content / len(pages) * 100) if pages else 0,
-        "page_quality_distribution": {
-            "empty_pages": empty_pages,
-            "low_content_pages": low_content_pages,
-            "moderate_content_pages": moderate_content_pages,
-            "good_content_pages": good_content_pages
-        },
-        "character_statistics": {
-            "min_chars_per_page": min(stripped_counts) if stripped_counts else 0,
-            "max_chars_per_page": max(stripped_counts) if stripped_counts else 0,
-            "median_chars_per_page": statistics.median(non_empty_counts) if non_empty_counts else 0,
-            "std_dev_chars_per_page": round(statistics.stdev(non_empty_counts), 2) if len(non_empty_counts) > 1 else 0
-        },
-        "potential_issues": {
-            "empty_or_failed_pages": empty_pages,
-            "suspiciously_low_content": low_content_pages,
-            "page_numbers_with_low_content": [p.page_number for p in pages if 0 < len(p.text.strip()) <= 100]
-        }
-    }
+    extraction_stats = _calculate_extraction_stats(pages)
     
     logger.info(f"OCR completed for {len(pages)} pages")
-    logger.info(f"Total characters: {total_chars:,}")
-    logger.info(f"Pages with content: {pages_with_content}/{len(pages)} ({extraction_stats['extraction_coverage']:.1f}%)")
-    logger.info(f"Quality: Empty={empty_pages}, Low={low_content_pages}, Moderate={moderate_content_pages}, Good={good_content_pages}")
+    _log_extraction_stats(extraction_stats)
     
     return pages, extraction_stats
 
 
-def extract_text(pdf_path: Path, pdf_type: str) -> tuple[List[PageText], dict]:
+def extract_text(
+    pdf_path: Path,
+    pdf_type: str,
+    pdf: Optional[pdfplumber.PDF] = None,
+    page_range: Optional[Tuple[int, int]] = None
+) -> tuple[List[PageText], dict]:
     """
     Extract text from a PDF file based on its type.
     
+    Text PDFs go through the PDF_BACKEND set in config: pdfplumber by
+    default, or pypdfium2 when it is "pdfium".
+    
     Args:
         pdf_path: Path to the PDF file
         pdf_type: Type of PDF ('text' or 'scanned')
+        pdf: Already-open pdfplumber document to reuse for text PDFs
+            (ignored by the pdfium backend)
+        page_range: Optional (first, last) page numbers to limit text PDF
+            extraction to (scanned PDFs are always processed in full)
         
     Returns:
         Tuple of (List of PageText objects, extraction statistics dict)
     """
     if pdf_type == "scanned":
         return extract_text_from_scanned_pdf(pdf_path)
+    elif PDF_BACKEND == "pdfium":
+        return extract_text_with_pdfium(pdf_path, page_range)
     else:
-        return extract_text_from_text_pdf(pdf_path)
+        return extract_text_from_text_pdf(pdf_path, pdf, page_range)
 
 
 def get_full_text(pages: List[PageText]) -> str:
@@ -2,17 +2,60 @@
 Section boundary detector - analyzes PDF layout to identify section boundaries.
 """
 import logging
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import pdfplumber
 
 from pipeline.section_metadata import (
     TextBlock, SectionBoundary, SectionType, 
-    SECTION_KEYWORDS, SECTION_END_KEYWORDS
+    SECTION_KEYWORDS, SECTION_END_KEYWORDS, normalize_text
 )
 
 logger = logging.getLogger(__name__)
 
+# Additional keywords that typically mark end of narrative sections
+STRUCTURAL_KEYWORDS = [
+    "extract of annual return",
+    "annual return",
+    "board report",
+    "directors report",
+    "director's report",
+    "directors' report",
+    "corporate governance",
+    "corporate information",
+    "company information",
+    "particulars of employees",
+    "form no.",
+    "annexure",
+    "schedules to",
+    "notes forming part",
+    "significant accounting policies",
+    "disclosures under",
+    "statutory section"
+]
+
+# New section transition keywords (common in annual reports across industries)
+# These mark the transition from narrative sections to business/financial content
+NEW_SECTION_KEYWORDS = [
+    "key financial highlights",
+    "financial highlights",
+    "wealth creation",
+    "wealth preservation",
+    "performance highlights",
+    "business overview",
+    "our business",
+    "segment performance",
+    "operational highlights",
+    "strategic priorities",
+    "board of directors"
+]
+
+# Block text is compared in normalized form, so normalize the keywords the
+# same way ("director's report" -> "director s report")
+STRUCTURAL_KEYWORDS = tuple(dict.fromkeys(normalize_text(k) for k in STRUCTURAL_KEYWORDS))
+NEW_SECTION_KEYWORDS = tuple(dict.fromkeys(normalize_text(k) for k in NEW_SECTION_KEYWORDS))
+
 
 class SectionBoundaryDetector:
     """
@@ -20,14 +63,17 @@ class SectionBoundaryDetector:
     Uses font size, position, and keyword matching.
     """
     
-    def __init__(self, pdf_path: Path):
+    def __init__(self, pdf_path: Path, pdf: Optional[pdfplumber.PDF] = None):
         """
         Initialize detector with PDF path.
         
         Args:
             pdf_path: Path to PDF file
+            pdf: Already-open pdfplumber document to reuse (e.g. the one text
+                extraction used) so pages are not parsed a second time
         """
         self.pdf_path = pdf_path
+        self.pdf = pdf
         self.text_blocks: List[TextBlock] = []
         
     def extract_layout_metadata(self) -> List[TextBlock]:
@@ -41,7 +87,7 @@ class SectionBoundaryDetector:
         blocks = []
         
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
+            with (nullcontext(self.pdf) if self.pdf is not None else pdfplumber.open(self.pdf_path)) as pdf:
                 for page_num, page in enumerate(pdf.pages, start=1):
                     # Extract text with layout information
                     words = page.extract_words(
@@ -359,43 +405,6 @@ class SectionBoundaryDetector:
         # Look for end indicators after start page
         subsequent_blocks = [b for b in self.text_blocks if b.page_number > start_page]
         
-        # Additional keywords that typically mark end of narrative sections
-        structural_keywords = [
-            "extract of annual return",
-            "annual return",
-            "board report",
-            "directors report",
-            "director's report",
-            "directors' report",
-            "corporate governance",
-            "corporate information",
-            "company information",
-            "particulars of employees",
-            "form no.",
-            "annexure",
-            "schedules to",
-            "notes forming part",
-            "significant accounting policies",
-            "disclosures under",
-            "statutory section"
-        ]
-        
-        # New section transition keywords (common in annual reports across industries)
-        # These mark the transition from narrative sections to business/financial content
-        new_section_keywords = [
-            "key financial highlights",
-            "financial highlights",
-            "wealth creation",
-            "wealth preservation",
-            "performance highlights",
-            "business overview",
-            "our business",
-            "segment performance",
-            "operational highlights",
-            "strategic priorities",
-            "board of directors"
-        ]
-        
         # For letters, track pages to detect consistent new section headings
         last_heading_page = start_page
         
@@ -413,7 +422,7 @@ class SectionBoundaryDetector:
             
             # Check for structural section markers (especially important for letters)
             if section_type == SectionType.LETTER_TO_STAKEHOLDERS:
-                for struct_keyword in structural_keywords:
+                for struct_keyword in STRUCTURAL_KEYWORDS:
                     if struct_keyword in normalized and self._is_potential_heading(block, None):
                         logger.debug(
                             f"Section end detected at page {block.page_number}: "
@@ -423,7 +432,7 @@ class SectionBoundaryDetector:
                 
                 # Check for new section transitions (big headings that mark letter end)
                 # Look for keywords with prominent font size (industry standard approach)
-                for new_keyword in new_section_keywords:
+                for new_keyword in NEW_SECTION_KEYWORDS:
                     if new_keyword in normalized and self._is_potential_heading(block, None):
                         # Get page fonts to calculate median
                         page_fonts = [b.font_size for b in self.text_blocks 
@@ -2,7 +2,7 @@
 Section content extractor - extracts section content from already-processed text.
 """
 import logging
-import json
+import orjson
 from pathlib import Path
 from typing import List, Dict, Optional
 from docx import Document
@@ -174,8 +174,8 @@ class SectionContentExtractor:
                     "note": "Section not found in document"
                 }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         logger.info(f"Saved metadata to {output_path}")
         
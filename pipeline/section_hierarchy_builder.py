@@ -15,6 +15,8 @@ from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
 
+from pipeline.utils import write_file_atomic
+
 logger = logging.getLogger(__name__)
 
 
@@ -414,8 +416,9 @@ class SectionHierarchyBuilder:
         """
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(hierarchy, f, indent=2, ensure_ascii=False)
+        # Serialize up front and replace the file atomically
+        data = json.dumps(hierarchy, indent=2, ensure_ascii=False).encode('utf-8')
+        write_file_atomic(output_path, data)
         
         logger.info(f"Section JSON exported to: {output_path}")
         return output_path
@@ -1,10 +1,27 @@
 """
 Data structures for section metadata and boundaries.
 """
+import functools
+import re
+import sys
 from dataclasses import dataclass
 from typing import Optional, List
 from enum import Enum
 
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
+@functools.lru_cache(maxsize=8192)
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text, replace punctuation with spaces and collapse whitespace.
+    
+    Cached because PDFs repeat many short lines (running headers, footers,
+    copyright notices) and the detector normalizes every block repeatedly.
+    """
+    text = _PUNCT_RE.sub(' ', text.lower())
+    return ' '.join(text.split())
+
 
 class SectionType(Enum):
     """Enumeration of supported section types."""
@@ -28,11 +45,7 @@ class TextBlock:
     @property
     def normalized_text(self) -> str:
         """Return lowercase text with punctuation removed."""
-        import re
-        text = self.text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = ' '.join(text.split())
-        return text
+        return normalize_text(self.text)
     
     @property
     def line_length(self) -> int:
@@ -309,3 +322,15 @@ SECTION_END_KEYWORDS = [
     "cash flow statement",
     "statement of financial position"
 ]
+
+# Canonicalize keywords with the same normalization applied to block text so
+# substring/equality checks compare like with like ("md&a" -> "md a"), drop
+# duplicates produced by normalization while keeping priority order, and
+# intern the results for cheap identity-first comparisons.
+SECTION_KEYWORDS = {
+    section_type: tuple(dict.fromkeys(sys.intern(normalize_text(k)) for k in keywords))
+    for section_type, keywords in SECTION_KEYWORDS.items()
+}
+SECTION_END_KEYWORDS = tuple(
+    dict.fromkeys(sys.intern(normalize_text(k)) for k in SECTION_END_KEYWORDS)
+)
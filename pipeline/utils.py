@@ -2,9 +2,11 @@
 Utility functions for the PDF processing pipeline.
 """
 import logging
+import os
 import re
-from pathlib import Path
-from typing import Optional
+import stat
+import uuid
+from typing import Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -74,35 +76,69 @@ def estimate_processing_time(file_size_mb: float, pdf_type: str) -> str:
         return f"~{hours:.1f} hours"
 
 
-def validate_pdf(pdf_path: Path) -> bool:
+def validate_pdf(pdf_path: Union[str, os.PathLike]) -> bool:
     """
     Validate that a file is a readable PDF.
     
+    Uses a single os.stat() call instead of separate exists/is_file/stat
+    lookups, which matters when scanning many files on network storage.
+    
     Args:
         pdf_path: Path to PDF file
         
     Returns:
         True if valid PDF, False otherwise
     """
-    if not pdf_path.exists():
+    try:
+        st = os.stat(pdf_path)
+    except FileNotFoundError:
         logger.error(f"File not found: {pdf_path}")
         return False
     
-    if not pdf_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         logger.error(f"Not a file: {pdf_path}")
         return False
     
-    if pdf_path.suffix.lower() != '.pdf':
+    if os.path.splitext(os.fspath(pdf_path))[1].lower() != '.pdf':
         logger.error(f"Not a PDF file: {pdf_path}")
         return False
     
-    if pdf_path.stat().st_size == 0:
+    if st.st_size == 0:
         logger.error(f"Empty file: {pdf_path}")
         return False
     
     return True
 
 
+def write_file_atomic(path: Union[str, os.PathLike], data: bytes) -> None:
+    """
+    Write data to path via a temporary file in the same directory.
+    
+    The temporary file is renamed over path only after the write succeeds,
+    so a crash or Ctrl-C mid-write never leaves a truncated file behind.
+    
+    Args:
+        path: Destination file
+        data: Complete file contents
+    """
+    path = os.fspath(path)
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    
+    # os.open with 0o666 honours the umask, like a plain open() would
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 def create_progress_callback(total_items: int, description: str = "Processing"):
     """
     Create a progress callback for tracking processing.
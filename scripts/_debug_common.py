@@ -0,0 +1,63 @@
+"""
+Shared helpers for the letter detection debug scripts.
+
+Used by test_letter_detection.py and verify_detection.py.
+"""
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+import orjson
+
+from pipeline.section_boundary_detector import SectionBoundaryDetector
+from pipeline.section_metadata import TextBlock
+from pipeline.utils import write_file_atomic
+
+# Text blocks from SectionBoundaryDetector.extract_layout_metadata(), one
+# file per PDF version, kept in a scratch directory between runs
+LAYOUT_CACHE_DIR = Path(tempfile.gettempdir()) / "pdf_reports_layout_cache"
+
+logger = logging.getLogger(__name__)
+
+
+def cached_layout_detector(pdf_path: Path) -> SectionBoundaryDetector:
+    """
+    Return a SectionBoundaryDetector for pdf_path with its layout extracted.
+    
+    The text blocks are saved under LAYOUT_CACHE_DIR keyed by the PDF's path,
+    mtime and size, so running the detection scripts again on an unchanged
+    PDF skips parsing every page. Delete the cache directory after changing
+    extract_layout_metadata() itself.
+    """
+    detector = SectionBoundaryDetector(pdf_path)
+    try:
+        stat = pdf_path.stat()
+    except OSError:
+        # Nothing to cache; leave the error to extract_layout_metadata
+        detector.extract_layout_metadata()
+        return detector
+    
+    key = f"{pdf_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+    cache_path = LAYOUT_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            detector.text_blocks = [
+                TextBlock(**{**block, "bbox": tuple(block["bbox"])})
+                for block in orjson.loads(f.read())
+            ]
+        return detector
+    except (OSError, orjson.JSONDecodeError, KeyError, TypeError):
+        pass
+    
+    detector.extract_layout_metadata()
+    # An empty result usually means the PDF could not be read; don't keep it
+    if detector.text_blocks:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_file_atomic(cache_path, orjson.dumps(detector.text_blocks))
+        except OSError as e:
+            logger.warning(f"Could not save layout cache {cache_path}: {e}")
+    
+    return detector
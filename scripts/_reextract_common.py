@@ -0,0 +1,314 @@
+"""
+Shared helpers for the letter re-extraction scripts.
+
+Report discovery, PDF lookup and sections_metadata.json updates used by
+reextract_letters.py, reextract_letters_smart.py and reextract_proper.py.
+"""
+import functools
+import os
+import re
+import sys
+import logging
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import orjson
+
+from config.config import OUTPUT_DIR
+from pipeline.utils import write_file_atomic
+
+# Data directory is at project root, not in config
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Cache of reports that already have a letter, kept in OUTPUT_DIR between runs
+SCAN_CACHE_NAME = ".reextract_cache.json"
+
+# Section files a fully extracted report has in its sections/ directory
+SECTION_FILES = frozenset({"mdna.json", "letter_to_stakeholders.json"})
+
+# Index of the PDFs under DATA_DIR, kept in OUTPUT_DIR between runs (not in
+# DATA_DIR, where writing it would change the mtimes it is checked against)
+PDF_INDEX_NAME = ".pdf_index.json"
+
+logger = logging.getLogger(__name__)
+
+
+def worker_context():
+    """
+    Multiprocessing context for the re-extraction worker pools.
+    
+    On Linux, fork workers from the already-initialised parent so each one
+    starts with pipeline, pdfplumber and config imported instead of paying
+    for those imports again (Python 3.14 no longer forks by default). Other
+    platforms use spawn, where fork is unsafe or unavailable.
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def entry_names(path) -> set:
+    """Return the names in a directory from one scandir pass (empty if missing)"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def _scan_pdfs(path: str, pdfs: List[Tuple[str, str]], dir_mtimes: dict) -> None:
+    """
+    Append (stem, path) for every PDF under path, top-down like os.walk.
+    
+    Records each directory's mtime in dir_mtimes (keyed relative to
+    DATA_DIR) so a saved index can be checked without listing anything.
+    """
+    dir_mtimes[os.path.relpath(path, DATA_DIR)] = os.stat(path).st_mtime_ns
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                # Like os.walk, don't descend into symlinked directories
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif entry.name.lower().endswith(".pdf"):
+                pdfs.append((entry.name[:-4], entry.path))
+    
+    for subdir in subdirs:
+        _scan_pdfs(subdir, pdfs, dir_mtimes)
+
+
+def _load_company_index() -> Optional[list]:
+    """Return the index saved by build_company_index, or None if stale or missing"""
+    try:
+        with open(OUTPUT_DIR / PDF_INDEX_NAME, 'rb') as f:
+            saved = orjson.loads(f.read())
+        # Adding, removing or renaming an entry changes its directory's
+        # mtime, so unchanged mtimes everywhere mean unchanged contents
+        for rel_dir, mtime in saved["dirs"].items():
+            if os.stat(os.path.join(DATA_DIR, rel_dir)).st_mtime_ns != mtime:
+                return None
+    except (OSError, orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+        return None
+    
+    return [
+        (folder_name, [(stem, os.path.join(DATA_DIR, rel_path)) for stem, rel_path in pdfs])
+        for folder_name, pdfs in saved["folders"]
+    ]
+
+
+def build_company_index() -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    List every data folder with its PDFs, walking DATA_DIR at most once.
+    
+    The index is saved to OUTPUT_DIR with the mtime of every directory
+    under DATA_DIR; later runs reuse it while those mtimes are unchanged,
+    which costs one stat per directory instead of a full walk.
+    
+    Returns:
+        List of (casefolded folder name, [(pdf stem, pdf path)]) in directory order
+    """
+    company_index = _load_company_index()
+    if company_index is not None:
+        return company_index
+    
+    company_index = []
+    dir_mtimes = {".": os.stat(DATA_DIR).st_mtime_ns}
+    with os.scandir(DATA_DIR) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            pdfs = []
+            _scan_pdfs(entry.path, pdfs, dir_mtimes)
+            company_index.append((entry.name.casefold(), pdfs))
+    
+    saved = {
+        "dirs": dir_mtimes,
+        "folders": [
+            (folder_name, [(stem, os.path.relpath(path, DATA_DIR)) for stem, path in pdfs])
+            for folder_name, pdfs in company_index
+        ]
+    }
+    index_path = OUTPUT_DIR / PDF_INDEX_NAME
+    try:
+        write_file_atomic(index_path, orjson.dumps(saved))
+    except OSError as e:
+        logger.warning(f"Could not save PDF index {index_path}: {e}")
+    
+    return company_index
+
+
+@functools.lru_cache(maxsize=None)
+def _year_pattern(year: str, short_year: bool) -> re.Pattern:
+    """Compiled regex matching year (and its short form) in a PDF stem"""
+    forms = [re.escape(year)]
+    if short_year:
+        forms.append(re.escape(year.replace("20", "")))
+    return re.compile("|".join(forms))
+
+
+def lookup_pdf(
+    company_name: str,
+    year: str,
+    company_index: List[Tuple[str, List[Tuple[str, str]]]],
+    short_year: bool = True
+) -> Optional[Path]:
+    """
+    Find the PDF file corresponding to a report.
+    
+    Args:
+        company_name: Company name from output directory
+        year: Year from output directory
+        company_index: Data folders and their PDFs from build_company_index()
+        short_year: Also accept the year with "20" removed (e.g. "23" for "2023")
+    
+    Returns:
+        Path to PDF file or None if not found
+    """
+    # Folder names are casefolded once when the index is built
+    company_key = company_name.casefold()
+    
+    # Search the indexed data folders for a matching company
+    for folder_name, pdfs in company_index:
+        # Match company name (handle variations)
+        if company_key in folder_name:
+            # Find PDFs with matching year
+            year_re = _year_pattern(year, short_year)
+            for stem, pdf_path in pdfs:
+                if year_re.search(stem):
+                    return Path(pdf_path)
+    
+    return None
+
+
+def scan_reports_without_letters(include_sizes: bool = False) -> List[tuple]:
+    """
+    Find all reports that have a report.json but no letter_to_stakeholders.
+    
+    Args:
+        include_sizes: If True, append the PDF size in MB to each tuple and
+            sort smallest first
+    
+    Returns:
+        List of tuples: (company_name, year, output_dir, pdf_path[, size_mb])
+    """
+    reports_needing_letters = []
+    company_index = None  # Built on first lookup
+    
+    # Reports known to have a letter, keyed by the sections/ mtime seen then.
+    # Adding or removing a file changes the directory's mtime, so an
+    # unchanged mtime means the letter is still there.
+    cache_path = OUTPUT_DIR / SCAN_CACHE_NAME
+    try:
+        with open(cache_path, 'rb') as f:
+            letter_cache = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        letter_cache = {}
+    new_letter_cache = {}
+    
+    # scandir entries carry d_type, so the is_dir checks need no stat call
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
+                continue
+            
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    company_name = company_entry.name
+                    year = year_entry.name
+                    cache_key = f"{company_name}/{year}"
+                    sections_dir = os.path.join(year_entry.path, "sections")
+                    try:
+                        sections_mtime = os.stat(sections_dir).st_mtime_ns
+                    except OSError:
+                        sections_mtime = None
+                    
+                    # Skip reports whose letter was found on a previous run
+                    if sections_mtime is not None and letter_cache.get(cache_key) == sections_mtime:
+                        new_letter_cache[cache_key] = sections_mtime
+                        continue
+                    
+                    # Check if letter already exists
+                    if "letter_to_stakeholders.json" in entry_names(sections_dir):
+                        new_letter_cache[cache_key] = sections_mtime
+                        continue  # Already has letter
+                    
+                    # Check if report exists
+                    if "report.json" not in entry_names(year_entry.path):
+                        continue
+                    
+                    # Find corresponding PDF
+                    if company_index is None:
+                        company_index = build_company_index()
+                    pdf_path = lookup_pdf(company_name, year, company_index)
+                    if not pdf_path:
+                        logger.warning(f"PDF not found for {company_name} / {year}")
+                        continue
+                    
+                    report = (company_name, year, Path(year_entry.path), pdf_path)
+                    if include_sizes:
+                        report += (os.path.getsize(pdf_path) / (1024 * 1024),)
+                    reports_needing_letters.append(report)
+    
+    try:
+        write_file_atomic(cache_path, orjson.dumps(new_letter_cache))
+    except OSError as e:
+        logger.warning(f"Could not save scan cache {cache_path}: {e}")
+    
+    if include_sizes:
+        # Sort by size (smallest first to avoid hangs)
+        reports_needing_letters.sort(key=lambda x: x[4])
+    
+    return reports_needing_letters
+
+
+def update_sections_metadata(metadata_path: Path, sections: List[tuple]) -> None:
+    """
+    Record re-extracted sections in sections_metadata.json.
+    
+    All sections are written in a single read-modify-write, so a report
+    with several re-extracted sections parses and rewrites the file once.
+    
+    Args:
+        metadata_path: Path to sections_metadata.json (created if missing)
+        sections: (SectionBoundary, SectionContent) pairs; each is stored
+            under its section type's value (e.g. "letter_to_stakeholders")
+    """
+    # Load existing metadata
+    if metadata_path.exists():
+        with open(metadata_path, 'rb') as f:
+            metadata = orjson.loads(f.read())
+    else:
+        metadata = {}
+    
+    extraction_date = datetime.now().isoformat()
+    
+    # Update each section
+    for boundary, content in sections:
+        metadata[boundary.section_type.value] = {
+            "boundary": {
+                "section_type": boundary.section_type.value,
+                "start_page": boundary.start_page,
+                "end_page": boundary.end_page,
+                "confidence": boundary.confidence,
+                "start_heading": boundary.start_heading,
+                "detection_method": boundary.detection_method
+            },
+            "content_stats": {
+                "section_type": content.section_type.value,
+                "start_page": content.start_page,
+                "end_page": content.end_page,
+                "character_count": content.character_count,
+                "page_count": content.page_count
+            },
+            "extracted": True,
+            "extraction_date": extraction_date
+        }
+    
+    # Written atomically so an interrupted run never leaves a truncated file
+    write_file_atomic(metadata_path, orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
@@ -3,15 +3,30 @@ Delete outputs for reports missing sections and create list for reprocessing.
 """
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.config import OUTPUT_DIR
 import logging
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+DELETE_WORKERS = 8
+
+
+def _safe_rmtree(path: Path) -> Optional[Exception]:
+    """Delete a directory tree, returning the error instead of raising it."""
+    try:
+        shutil.rmtree(path)
+    except Exception as e:
+        return e
+    return None
+
 
 def main():
     logger.info("=" * 80)
@@ -54,8 +69,11 @@ def main():
         return
     
     logger.info(f"\nFound {len(incomplete_reports)} reports with missing sections:")
-    mdna_count = sum(1 for r in incomplete_reports if "MD&A" in r['missing'])
-    letter_count = sum(1 for r in incomplete_reports if "Letter" in r['missing'])
+    mdna_count = letter_count = 0
+    for r in incomplete_reports:
+        missing = r['missing']
+        mdna_count += "MD&A" in missing
+        letter_count += "Letter" in missing
     logger.info(f"  Missing MD&A: {mdna_count}")
     logger.info(f"  Missing Letter: {letter_count}")
     
@@ -74,13 +92,15 @@ def main():
     logger.info("\nDeleting incomplete report folders...")
     deleted = 0
     
-    for report in incomplete_reports:
-        try:
-            shutil.rmtree(report['year_dir'])
-            deleted += 1
-            logger.info(f"  ✓ Deleted: {report['company']}/{report['year']}")
-        except Exception as e:
-            logger.error(f"  ✗ Error deleting {report['company']}/{report['year']}: {e}")
+    # rmtree is syscall-bound and releases the GIL, so threads overlap the I/O
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        errors = executor.map(_safe_rmtree, (r['year_dir'] for r in incomplete_reports))
+        for report, error in zip(incomplete_reports, errors):
+            if error is None:
+                deleted += 1
+                logger.info(f"  ✓ Deleted: {report['company']}/{report['year']}")
+            else:
+                logger.error(f"  ✗ Error deleting {report['company']}/{report['year']}: {error}")
     
     logger.info(f"\n✅ Deleted {deleted} incomplete report folders")
     logger.info("\nNext step: Run the batch processing script to reprocess these PDFs:")
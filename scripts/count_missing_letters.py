@@ -2,11 +2,13 @@
 
 from pathlib import Path
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from scripts.reextract_letters import find_reports_without_letters
+from scripts._reextract_common import scan_reports_without_letters
 
-reports = find_reports_without_letters()
+reports = scan_reports_without_letters()
 
 print(f"Reports without letters: {len(reports)}")
 print("\nFirst 10:")
@@ -8,7 +8,9 @@ from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.config import OUTPUT_DIR
 import logging
 
@@ -91,8 +93,10 @@ def main():
         return
     
     logger.info(f"\nFound {len(missing)} sections with JSON but no DOCX:")
-    mdna_count = sum(1 for m in missing if m['section'] == 'mdna')
-    letter_count = sum(1 for m in missing if m['section'] == 'letter_to_stakeholders')
+    mdna_count = letter_count = 0
+    for m in missing:
+        mdna_count += m['section'] == 'mdna'
+        letter_count += m['section'] == 'letter_to_stakeholders'
     logger.info(f"  MD&A: {mdna_count}")
     logger.info(f"  Letter: {letter_count}")
     
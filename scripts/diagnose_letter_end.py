@@ -2,7 +2,9 @@
 
 from pathlib import Path
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from pipeline.section_boundary_detector import SectionBoundaryDetector
 
@@ -1,43 +1,57 @@
 import os
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+
+def iter_metadata_paths(outputs_dir):
+    """Yield (company, year, metadata_path) for every company/year output folder."""
+    with os.scandir(outputs_dir) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
+                continue
+            
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    metadata_path = os.path.join(year_entry.path, "sections", "sections_metadata.json")
+                    yield company_entry.name, year_entry.name, metadata_path
+
+def _check_one(item):
+    """Return a missing-letter record for one report, or None if it has a letter."""
+    company_dir, year_dir, metadata_path = item
+    
+    # Check sections_metadata.json (no stat first - a missing file just raises)
+    try:
+        with open(metadata_path, 'rb') as f:
+            metadata = orjson.loads(f.read())
+        
+        # Check if letter exists (a malformed file raises here, like a bad read)
+        has_letter = any(
+            s.get('section_type') == 'letter_to_stakeholders'
+            for s in metadata.get('sections', [])
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading {metadata_path}: {e}")
+        return None
+    
+    if has_letter:
+        return None
+    return {
+        'company': company_dir,
+        'year': year_dir
+    }
 
 def list_missing_letters():
     """List all reports that don't have letters extracted."""
     outputs_dir = "config/outputs"
-    missing = []
     
-    for company_dir in os.listdir(outputs_dir):
-        company_path = os.path.join(outputs_dir, company_dir)
-        if not os.path.isdir(company_path):
-            continue
-            
-        for year_dir in os.listdir(company_path):
-            year_path = os.path.join(company_path, year_dir)
-            if not os.path.isdir(year_path):
-                continue
-            
-            # Check sections_metadata.json
-            metadata_path = os.path.join(year_path, "sections", "sections_metadata.json")
-            if not os.path.exists(metadata_path):
-                continue
-            
-            try:
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                # Check if letter exists
-                has_letter = any(
-                    s.get('section_type') == 'letter_to_stakeholders'
-                    for s in metadata.get('sections', [])
-                )
-                
-                if not has_letter:
-                    missing.append({
-                        'company': company_dir,
-                        'year': year_dir
-                    })
-            except Exception as e:
-                print(f"Error reading {metadata_path}: {e}")
+    # Reading many small files is I/O-bound, so overlap the opens across threads
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = executor.map(_check_one, iter_metadata_paths(outputs_dir))
+        missing = [r for r in results if r is not None]
     
     # Sort by company and year
     missing.sort(key=lambda x: (x['company'], x['year']))
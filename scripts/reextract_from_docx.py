@@ -3,14 +3,20 @@ Re-extract MD&A and/or Letter to Stakeholders from existing DOCX files.
 Only extracts sections that are missing - preserves existing extractions.
 """
 import sys
-import json
+import os
+import multiprocessing
+import zipfile
+import orjson
 from pathlib import Path
-from docx import Document
+from xml.sax.saxutils import escape as xml_escape
+from lxml import etree
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.config import OUTPUT_DIR
+from scripts._reextract_common import SECTION_FILES, entry_names
 from pipeline.section_metadata import SectionType, SECTION_KEYWORDS
 import logging
 import re
@@ -21,61 +27,153 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# WordprocessingML tags used when streaming document.xml
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = f'{W_NS}body'
+W_P = f'{W_NS}p'
+W_T = f'{W_NS}t'
+W_TAB = f'{W_NS}tab'
+W_BR = f'{W_NS}br'
+W_CR = f'{W_NS}cr'
+W_TYPE = f'{W_NS}type'
+
+PUNCT_RE = re.compile(r'[^\w\s]+')
+
+# Keyword sets built once (SECTION_KEYWORDS is already lowercased/normalized)
+ALL_KEYWORDS = frozenset(k for keywords in SECTION_KEYWORDS.values() for k in keywords)
+KEYWORDS_BY_TYPE = {
+    section_type: frozenset(keywords)
+    for section_type, keywords in SECTION_KEYWORDS.items()
+}
+
+# One alternation over every section keyword so each paragraph is scanned in
+# a single pass. Inside a lookahead it matches at every position, giving the
+# longest keyword starting there (longer keywords come first), so the longest
+# keyword anywhere in the text can be picked even where keywords overlap
+KEYWORD_RE = re.compile('(?=(' + '|'.join(
+    re.escape(keyword) for keyword in sorted(ALL_KEYWORDS, key=len, reverse=True)
+) + '))')
+
+# Minimal DOCX package written by save_section_docx
+DOCX_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCX_DOCUMENT_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:body>{body}<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" '
+    'w:header="720" w:footer="720" w:gutter="0"/></w:sectPr></w:body>'
+    '</w:document>'
+)
+DOCX_TITLE_RPR = '<w:rPr><w:rFonts w:ascii="Calibri Light" w:hAnsi="Calibri Light"/><w:sz w:val="56"/></w:rPr>'
+DOCX_BOLD_RPR = '<w:rPr><w:b/></w:rPr>'
+DOCX_ITALIC_RPR = '<w:rPr><w:i/></w:rPr>'
+DOCX_BODY_RPR = '<w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/><w:sz w:val="22"/></w:rPr>'
+
+# Characters that are not allowed in XML 1.0 documents
+INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
 
 def find_reports_missing_sections():
     """Find all reports missing MD&A and/or Letter to Stakeholders"""
     missing = []
     
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-            
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
+    # One listing per year dir and one per sections/ answer every
+    # existence check, with no Path objects or stat calls per file
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
                 continue
-                
-            sections_dir = year_dir / "sections"
-            mdna_file = sections_dir / "mdna.json"
-            letter_file = sections_dir / "letter_to_stakeholders.json"
-            docx_file = year_dir / "report.docx"
             
-            # Check if DOCX exists and has sections dir
-            if not docx_file.exists() or not sections_dir.exists():
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    sections_dir = os.path.join(year_entry.path, "sections")
+                    section_files = entry_names(sections_dir)
+                    
+                    # Fully extracted reports need no further checks
+                    if SECTION_FILES <= section_files:
+                        continue
+                    
+                    year_files = entry_names(year_entry.path)
+                    
+                    # Check if DOCX exists and has sections dir
+                    if "report.docx" not in year_files or "sections" not in year_files:
+                        continue
+                    
+                    # Check what's missing
+                    missing_sections = []
+                    if "mdna.json" not in section_files:
+                        missing_sections.append("mdna")
+                    if "letter_to_stakeholders.json" not in section_files:
+                        missing_sections.append("letter")
+                    
+                    if missing_sections:
+                        missing.append({
+                            "company": company_entry.name,
+                            "year": year_entry.name,
+                            "docx_path": Path(year_entry.path, "report.docx"),
+                            "sections_dir": Path(sections_dir),
+                            "missing_sections": missing_sections
+                        })
+    
+    return missing
+
+
+def iter_docx_paragraphs(docx_path):
+    """
+    Stream body paragraph text from a DOCX without building a python-docx Document.
+    
+    Parses word/document.xml incrementally and mirrors Paragraph.text: run text
+    plus tabs and line breaks. Paragraphs nested in tables are skipped, like
+    Document.paragraphs.
+    """
+    with zipfile.ZipFile(docx_path) as docx_zip, docx_zip.open('word/document.xml') as fp:
+        for _, elem in etree.iterparse(fp, events=('end',), tag=W_P):
+            parent = elem.getparent()
+            if parent is None or parent.tag != W_BODY:
                 continue
             
-            # Check what's missing
-            missing_sections = []
-            if not mdna_file.exists():
-                missing_sections.append("mdna")
-            if not letter_file.exists():
-                missing_sections.append("letter")
+            parts = []
+            for node in elem.iter(W_T, W_TAB, W_BR, W_CR):
+                if node.tag == W_T:
+                    parts.append(node.text or '')
+                elif node.tag == W_TAB:
+                    parts.append('\t')
+                elif node.get(W_TYPE) in (None, 'textWrapping'):
+                    parts.append('\n')
+            yield ''.join(parts)
             
-            if missing_sections:
-                missing.append({
-                    "company": company_dir.name,
-                    "year": year_dir.name,
-                    "docx_path": docx_file,
-                    "sections_dir": sections_dir,
-                    "missing_sections": missing_sections
-                })
-    
-    return missing
+            # Free parsed paragraphs as we go to keep memory flat
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
 
 
 def read_docx_with_structure(docx_path):
     """Read DOCX and extract text with heading information"""
-    doc = Document(docx_path)
-    
-    # Get all keywords to look for
-    all_keywords = set()
-    for keywords in SECTION_KEYWORDS.values():
-        all_keywords.update(keywords)
-    
     sections = []
     current_section = None
     
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    for para_text in iter_docx_paragraphs(docx_path):
+        text = para_text.strip()
         if not text or text == "=== PAGE BREAK ===":
             continue
         
@@ -83,39 +181,56 @@ def read_docx_with_structure(docx_path):
         if text.startswith("Page ") and len(text) < 10:
             continue
         
-        # Check if this paragraph contains section keywords (potential heading)
-        text_lower = text.lower()
-        text_normalized = re.sub(r'[^\w\s]', ' ', text_lower)
-        text_normalized = ' '.join(text_normalized.split())
-        
+        # Check if this paragraph contains section keywords (potential heading).
+        # Long paragraphs are body text, so skip normalizing and scanning them.
         is_potential_heading = False
         matched_keyword = None
-        for keyword in all_keywords:
-            if keyword in text_normalized and len(text) < 300:
-                is_potential_heading = True
-                matched_keyword = keyword
-                break
+        if len(text) < 300:
+            text_normalized = ' '.join(PUNCT_RE.sub(' ', text.lower()).split())
+            # The most specific (longest) keyword wins, wherever it appears
+            matched_keyword = max(
+                (match.group(1) for match in KEYWORD_RE.finditer(text_normalized)),
+                key=len,
+                default=None
+            )
+            is_potential_heading = matched_keyword is not None
         
         if is_potential_heading:
             # Save previous section if it has content
-            if current_section and len(current_section["text"]) > 100:  # At least 100 chars
-                sections.append(current_section)
+            if current_section and current_section["len"] > 100:  # At least 100 chars
+                sections.append(_finish_section(current_section))
             
-            # Start new section
-            current_section = {"heading": text, "text": text + "\n", "keyword": matched_keyword}
+            # Start new section (text collected as parts and joined once)
+            current_section = {
+                "heading": text,
+                "text_parts": [text, "\n"],
+                "len": len(text) + 1,
+                "keyword": matched_keyword
+            }
         elif current_section:
-            current_section["text"] += text + "\n"
+            current_section["text_parts"].append(text)
+            current_section["text_parts"].append("\n")
+            current_section["len"] += len(text) + 1
     
     # Add last section
-    if current_section and len(current_section["text"]) > 100:
-        sections.append(current_section)
+    if current_section and current_section["len"] > 100:
+        sections.append(_finish_section(current_section))
     
     return sections
 
 
+def _finish_section(section):
+    """Join collected text parts into the section dict returned to callers"""
+    return {
+        "heading": section["heading"],
+        "text": ''.join(section["text_parts"]),
+        "keyword": section["keyword"]
+    }
+
+
 def find_section_in_docx(sections, section_type):
     """Find a section by matching keywords"""
-    keywords = SECTION_KEYWORDS.get(section_type, [])
+    keywords = KEYWORDS_BY_TYPE.get(section_type, frozenset())
     
     best_match = None
     best_score = 0
@@ -160,48 +275,66 @@ def save_section_json(section_data, output_file, company, year, section_type):
         "extraction_method": "docx_keyword_matching"
     }
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
     
     return output_file
 
 
+def _docx_run(text, run_props=''):
+    """Build a <w:r> for text, turning newlines/tabs into Word breaks/tabs"""
+    text = INVALID_XML_RE.sub('', text)
+    parts = []
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            parts.append('<w:br/>')
+        for j, chunk in enumerate(line.split('\t')):
+            if j:
+                parts.append('<w:tab/>')
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{xml_escape(chunk)}</w:t>')
+    return f'<w:r>{run_props}{"".join(parts)}</w:r>'
+
+
 def save_section_docx(section_data, output_file, company, year, section_type):
-    """Save extracted section to DOCX file"""
-    from docx import Document
-    from docx.shared import Pt, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    
-    doc = Document()
+    """
+    Save extracted section to DOCX file.
     
-    # Add title
+    Writes the WordprocessingML package directly instead of going through
+    python-docx, which builds and serializes a wrapper object per paragraph.
+    """
     section_name_map = {
         SectionType.MDNA: "Management Discussion & Analysis",
         SectionType.LETTER_TO_STAKEHOLDERS: "Letter To Stakeholders"
     }
-    title = doc.add_heading(section_name_map.get(section_type, section_type.value), 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title = section_name_map.get(section_type, section_type.value)
+    
+    # Add title
+    body = [f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr>{_docx_run(title, DOCX_TITLE_RPR)}</w:p>']
     
     # Add metadata
-    metadata = doc.add_paragraph()
-    metadata.add_run(f"Company: {company}\n").bold = True
-    metadata.add_run(f"Year: {year}\n").bold = True
-    metadata.add_run(f"Detected Heading: {section_data['heading']}\n").italic = True
+    metadata_runs = [
+        _docx_run(f"Company: {company}\n", DOCX_BOLD_RPR),
+        _docx_run(f"Year: {year}\n", DOCX_BOLD_RPR),
+        _docx_run(f"Detected Heading: {section_data['heading']}\n", DOCX_ITALIC_RPR),
+    ]
+    body.append(f'<w:p>{"".join(metadata_runs)}</w:p>')
     
-    doc.add_paragraph()  # Empty line
+    body.append('<w:p/>')  # Empty line
     
     # Add section content
     # Split by paragraphs and add each one
-    paragraphs = section_data['text'].split('\n\n')
-    for para_text in paragraphs:
+    for para_text in section_data['text'].split('\n\n'):
         if para_text.strip():
-            p = doc.add_paragraph(para_text.strip())
-            # Set font
-            for run in p.runs:
-                run.font.name = 'Calibri'
-                run.font.size = Pt(11)
+            body.append(f'<w:p>{_docx_run(para_text.strip(), DOCX_BODY_RPR)}</w:p>')
+    
+    document_xml = DOCX_DOCUMENT_XML.format(body=''.join(body))
+    
+    with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED) as docx_zip:
+        docx_zip.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES_XML)
+        docx_zip.writestr('_rels/.rels', DOCX_RELS_XML)
+        docx_zip.writestr('word/document.xml', document_xml)
     
-    doc.save(str(output_file))
     return output_file
 
 
@@ -263,6 +396,11 @@ def reextract_sections_for_report(report_info):
         return {"success": False, "error": str(e)}
 
 
+def _reextract_worker(report_info):
+    """Pool entry point: return the report alongside its extraction result"""
+    return report_info, reextract_sections_for_report(report_info)
+
+
 def main():
     """Main function to re-extract missing sections"""
     logger.info("=" * 80)
@@ -309,43 +447,43 @@ def main():
         "errors": 0
     }
     
-    for i, report_info in enumerate(missing_reports, 1):
-        # Progress header with stats
-        progress_pct = (i / len(missing_reports)) * 100
-        elapsed = time.time() - start_time
-        avg_time = elapsed / i if i > 0 else 0
-        remaining = avg_time * (len(missing_reports) - i)
-        
-        logger.info(f"\n{'='*80}")
-        logger.info(f"[{i}/{len(missing_reports)}] ({progress_pct:.1f}%) {report_info['company']} - {report_info['year']}")
-        logger.info(f"  Missing: {', '.join(report_info['missing_sections'])}")
-        logger.info(f"  Running stats - MD&A: ✓{stats['mdna_extracted']} ✗{stats['mdna_not_found']} | Letter: ✓{stats['letter_extracted']} ✗{stats['letter_not_found']}")
-        if i > 1:
-            logger.info(f"  Time: {elapsed/60:.1f}min elapsed, ~{remaining/60:.1f}min remaining")
-        
-        try:
-            result = reextract_sections_for_report(report_info)
-            
-            if result["success"]:
-                for section_type, status in result["results"].items():
-                    stats[f"{section_type}_{status}"] += 1
-            else:
-                stats["errors"] += 1
+    # Reports are independent, so spread them across all cores and
+    # aggregate stats in the parent as results arrive
+    processed = 0
+    try:
+        with multiprocessing.Pool(os.cpu_count()) as pool:
+            results = pool.imap_unordered(_reextract_worker, missing_reports)
+            for i, (report_info, result) in enumerate(results, 1):
+                processed = i
+                
+                if result["success"]:
+                    for section_type, status in result["results"].items():
+                        stats[f"{section_type}_{status}"] += 1
+                else:
+                    stats["errors"] += 1
+                
+                # Progress with stats
+                progress_pct = (i / len(missing_reports)) * 100
+                elapsed = time.time() - start_time
+                avg_time = elapsed / i
+                remaining = avg_time * (len(missing_reports) - i)
+                
+                logger.info(f"\n{'='*80}")
+                logger.info(f"[{i}/{len(missing_reports)}] ({progress_pct:.1f}%) {report_info['company']} - {report_info['year']}")
+                logger.info(f"  Missing: {', '.join(report_info['missing_sections'])}")
+                logger.info(f"  Running stats - MD&A: ✓{stats['mdna_extracted']} ✗{stats['mdna_not_found']} | Letter: ✓{stats['letter_extracted']} ✗{stats['letter_not_found']}")
+                logger.info(f"  Time: {elapsed/60:.1f}min elapsed, ~{remaining/60:.1f}min remaining")
                 
-        except KeyboardInterrupt:
-            logger.warning("\n\n" + "="*80)
-            logger.warning("INTERRUPTED BY USER - Saving progress...")
-            logger.warning("="*80)
-            break
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}", exc_info=True)
-            stats["errors"] += 1
+    except KeyboardInterrupt:
+        logger.warning("\n\n" + "="*80)
+        logger.warning("INTERRUPTED BY USER - Saving progress...")
+        logger.warning("="*80)
     
     # Summary
     logger.info("\n" + "=" * 80)
     logger.info("Re-extraction Summary")
     logger.info("=" * 80)
-    logger.info(f"Total reports processed: {i}")
+    logger.info(f"Total reports processed: {processed}")
     logger.info(f"\nMD&A:")
     logger.info(f"  ✓ Extracted: {stats['mdna_extracted']}")
     logger.info(f"  ✗ Not found: {stats['mdna_not_found']}")
@@ -3,107 +3,54 @@ Re-extract letter_to_stakeholders for reports that don't have them yet.
 Uses the EXACT same pipeline method as main.py - not a gimmick.
 """
 import sys
-import json
+import os
+import orjson
 import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict
 from datetime import datetime
+from tqdm import tqdm
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from pipeline.section_boundary_detector import SectionBoundaryDetector
 from pipeline.section_content_extractor import SectionContentExtractor
 from pipeline.section_metadata import SectionType
 from pipeline.extract_text import PageText
-from config.config import OUTPUT_DIR, LOGS_DIR
-
-# Data directory is at project root, not in config
-DATA_DIR = Path(__file__).parent.parent / "data"
+from config.config import LOGS_DIR
+from scripts._reextract_common import scan_reports_without_letters, update_sections_metadata, worker_context
 
 # Setup logging
 log_file = LOGS_DIR / f"reextract_letters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 log_file.parent.mkdir(parents=True, exist_ok=True)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# File writes are buffered in memory and flushed after each report (and on
+# errors), so a report's ~10 status lines cost one write instead of ten
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+file_log_buffer = logging.handlers.MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.ERROR,
+    target=_file_handler
+)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler(log_file)
+        file_log_buffer
     ]
 )
 logger = logging.getLogger(__name__)
 
 
-def find_reports_without_letters() -> List[tuple]:
-    """
-    Find all reports that have MD&A but no letter_to_stakeholders.
-    
-    Returns:
-        List of tuples: (company_name, year, output_dir, pdf_path)
-    """
-    reports_needing_letters = []
-    
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-        
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
-                continue
-            
-            # Check if report exists
-            report_json = year_dir / "report.json"
-            if not report_json.exists():
-                continue
-            
-            # Check if letter already exists
-            sections_dir = year_dir / "sections"
-            letter_json = sections_dir / "letter_to_stakeholders.json"
-            
-            if letter_json.exists():
-                continue  # Already has letter
-            
-            # Find corresponding PDF
-            company_name = company_dir.name
-            year = year_dir.name
-            
-            pdf_path = find_pdf_for_report(company_name, year)
-            if pdf_path:
-                reports_needing_letters.append((company_name, year, year_dir, pdf_path))
-            else:
-                logger.warning(f"PDF not found for {company_name} / {year}")
-    
-    return reports_needing_letters
-
-
-def find_pdf_for_report(company_name: str, year: str) -> Optional[Path]:
-    """
-    Find the PDF file corresponding to a report.
-    
-    Args:
-        company_name: Company name from output directory
-        year: Year from output directory
-        
-    Returns:
-        Path to PDF file or None if not found
-    """
-    # Search in data directory for matching company folder
-    for company_folder in DATA_DIR.iterdir():
-        if not company_folder.is_dir():
-            continue
-        
-        # Match company name (handle variations)
-        if company_name.lower() in company_folder.name.lower():
-            # Find PDFs with matching year
-            for pdf_path in company_folder.rglob("*.pdf"):
-                if year in pdf_path.stem or year.replace("20", "") in pdf_path.stem:
-                    return pdf_path
-    
-    return None
-
-
 def load_pages_from_report(report_json_path: Path) -> List[PageText]:
     """
     Reconstruct PageText objects from report.json.
@@ -114,19 +61,15 @@ def load_pages_from_report(report_json_path: Path) -> List[PageText]:
     Returns:
         List of PageText objects
     """
-    with open(report_json_path, 'r', encoding='utf-8') as f:
-        report_data = json.load(f)
+    with open(report_json_path, 'rb') as f:
+        report_data = orjson.loads(f.read())
     
     pages = []
     
     # Extract text from hierarchical structure
     if 'structure' in report_data:
-        page_texts = {}  # page_num -> text content
-        
-        def extract_content_from_structure(structure_item, current_page):
-            """Recursively extract content from structure"""
-            texts = []
-            
+        def extract_content_from_structure(structure_item, texts):
+            """Recursively append content from structure into texts"""
             # Get heading
             if 'heading' in structure_item:
                 texts.append(structure_item['heading'])
@@ -141,19 +84,20 @@ def load_pages_from_report(report_json_path: Path) -> List[PageText]:
             # Process subsections
             if 'subsections' in structure_item:
                 for subsection in structure_item['subsections']:
-                    texts.extend(extract_content_from_structure(subsection, current_page))
-            
-            return texts
+                    extract_content_from_structure(subsection, texts)
+        
+        start_page = report_data.get('start_page', 1)
         
         # Process all structure items
         for item in report_data['structure']:
-            content_parts = extract_content_from_structure(item, report_data.get('start_page', 1))
+            content_parts = []
+            extract_content_from_structure(item, content_parts)
             content = '\n\n'.join(content_parts)
             
             # We don't have exact page boundaries from structure, so create single "page"
             # This is OK because boundary detector uses PDF directly
             pages.append(PageText(
-                page_number=report_data.get('start_page', 1),
+                page_number=start_page,
                 text=content,
                 char_count=len(content),
                 extraction_method='from_report_json'
@@ -175,10 +119,12 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
     Returns:
         True if letter was found and extracted, False otherwise
     """
-    logger.info(f"\n{'='*80}")
-    logger.info(f"Re-extracting letter for: {company_name} / {year}")
-    logger.info(f"PDF: {pdf_path.name}")
-    logger.info(f"{'='*80}")
+    logger.info(
+        f"\n{'='*80}\n"
+        f"Re-extracting letter for: {company_name} / {year}\n"
+        f"PDF: {pdf_path.name}\n"
+        f"{'='*80}"
+    )
     
     try:
         # Step 1: Use boundary detector to find letter section
@@ -228,36 +174,7 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
         logger.info("Step 5: Updating sections_metadata.json...")
         metadata_path = sections_dir / "sections_metadata.json"
         
-        # Load existing metadata
-        if metadata_path.exists():
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-        
-        # Update letter section
-        metadata["letter_to_stakeholders"] = {
-            "boundary": {
-                "section_type": letter_boundary.section_type.value,
-                "start_page": letter_boundary.start_page,
-                "end_page": letter_boundary.end_page,
-                "confidence": letter_boundary.confidence,
-                "start_heading": letter_boundary.start_heading,
-                "detection_method": letter_boundary.detection_method
-            },
-            "content_stats": {
-                "section_type": letter_content.section_type.value,
-                "start_page": letter_content.start_page,
-                "end_page": letter_content.end_page,
-                "character_count": letter_content.character_count,
-                "page_count": letter_content.page_count
-            },
-            "extracted": True,
-            "extraction_date": datetime.now().isoformat()
-        }
-        
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        update_sections_metadata(metadata_path, [(letter_boundary, letter_content)])
         
         logger.info(f"  ✓ Updated sections_metadata.json")
         logger.info(f"✓ Successfully re-extracted letter for {company_name} / {year}")
@@ -268,6 +185,15 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
         return False
 
 
+def _reextract_worker(*args) -> bool:
+    """Pool entry point: re-extract one report, then flush its buffered log lines"""
+    try:
+        return reextract_letter(*args)
+    finally:
+        # Pool workers exit without running logging's atexit flush
+        file_log_buffer.flush()
+
+
 def main():
     """Main entry point"""
     logger.info("="*80)
@@ -277,7 +203,7 @@ def main():
     
     # Find reports without letters
     logger.info("\nScanning for reports without letters...")
-    reports = find_reports_without_letters()
+    reports = scan_reports_without_letters()
     
     logger.info(f"\nFound {len(reports)} reports without letters")
     
@@ -300,15 +226,31 @@ def main():
         "not_found": []
     }
     
-    for i, (company_name, year, output_dir, pdf_path) in enumerate(reports, 1):
-        logger.info(f"\nProcessing {i}/{len(reports)}")
-        
-        success = reextract_letter(company_name, year, output_dir, pdf_path)
+    # Forked workers inherit the buffer; write out the parent's pending
+    # records first so no worker writes them to the log file again
+    file_log_buffer.flush()
+    
+    # Reports are independent and PDF parsing is CPU-bound, so fan out
+    # across processes and collect results as they finish
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=worker_context()) as executor:
+        futures = {
+            executor.submit(_reextract_worker, company_name, year, output_dir, pdf_path): (company_name, year)
+            for company_name, year, output_dir, pdf_path in reports
+        }
         
-        if success:
-            results["success"].append((company_name, year))
-        else:
-            results["not_found"].append((company_name, year))
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Re-extracting letters", unit="report"):
+            company_name, year = futures[future]
+            
+            try:
+                success = future.result()
+            except Exception as e:
+                logger.error(f"✗ Worker failed for {company_name} / {year}: {e}")
+                success = False
+            
+            if success:
+                results["success"].append((company_name, year))
+            else:
+                results["not_found"].append((company_name, year))
     
     # Summary
     logger.info("\n" + "="*80)
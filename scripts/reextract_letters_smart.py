@@ -2,105 +2,86 @@
 Re-extract letters, processing smaller PDFs first to avoid hanging on large files.
 """
 import sys
-import json
 import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 import os
+import pdfplumber
+from tqdm import tqdm
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from pipeline.section_boundary_detector import SectionBoundaryDetector
 from pipeline.section_content_extractor import SectionContentExtractor
 from pipeline.section_metadata import SectionType
 from pipeline.extract_text import extract_text
 from pipeline.detect_pdf_type import detect_pdf_type
-from config.config import OUTPUT_DIR, LOGS_DIR
-
-# Data directory is at project root, not in config
-DATA_DIR = Path(__file__).parent.parent / "data"
+from config.config import LOGS_DIR
+from scripts._reextract_common import scan_reports_without_letters, update_sections_metadata, worker_context
 
 # Setup logging
 log_file = LOGS_DIR / f"reextract_letters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 log_file.parent.mkdir(parents=True, exist_ok=True)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# File writes are buffered in memory and flushed after each report (and on
+# errors), so a report's ~10 status lines cost one write instead of ten
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+file_log_buffer = logging.handlers.MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.ERROR,
+    target=_file_handler
+)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler(log_file)
+        file_log_buffer
     ]
 )
 logger = logging.getLogger(__name__)
 
 
-def find_reports_without_letters() -> List[tuple]:
-    """Find all reports without letters, sorted by PDF size (smallest first)"""
-    reports_needing_letters = []
-    
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-        
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
-                continue
-            
-            # Check if letter already exists
-            sections_dir = year_dir / "sections"
-            letter_json = sections_dir / "letter_to_stakeholders.json"
-            
-            if letter_json.exists():
-                continue  # Already has letter
-            
-            # Check if report.json exists
-            report_json = year_dir / "report.json"
-            if not report_json.exists():
-                continue
-            
-            # Find corresponding PDF
-            company_name = company_dir.name
-            year = year_dir.name
-            
-            # Search in data directory for matching company folder
-            for company_folder in DATA_DIR.iterdir():
-                if not company_folder.is_dir():
-                    continue
-                
-                if company_name.lower() in company_folder.name.lower():
-                    # Find PDFs with matching year
-                    for pdf_path in company_folder.rglob("*.pdf"):
-                        if year in pdf_path.stem or year.replace("20", "") in pdf_path.stem:
-                            # Get file size
-                            size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
-                            reports_needing_letters.append((company_name, year, year_dir, pdf_path, size_mb))
-                            break
-                    break
-    
-    # Sort by size (smallest first to avoid hangs)
-    reports_needing_letters.sort(key=lambda x: x[4])
-    
-    return reports_needing_letters
+# PDFs above this size (MB) are skipped to avoid memory issues
+MAX_PDF_SIZE_MB = 100
+
+# PDF size buckets (MB, exclusive low / inclusive high), each with its own pool
+SIZE_BUCKETS_MB = [(float('-inf'), 20), (20, 50), (50, float('inf'))]
+
+
+def _bucket_workers() -> List[int]:
+    """Worker counts for SIZE_BUCKETS_MB: fewer concurrent jobs for larger PDFs"""
+    cpu_count = os.cpu_count() or 1
+    return [cpu_count, max(1, cpu_count // 2), max(1, cpu_count // 4)]
 
 
 def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: Path, size_mb: float) -> bool:
     """Re-extract letter using PDF layout analysis - same method as main pipeline"""
-    logger.info(f"\n{'='*80}")
-    logger.info(f"Re-extracting letter for: {company_name} / {year}")
-    logger.info(f"PDF: {pdf_path.name} ({size_mb:.1f} MB)")
-    logger.info(f"{'='*80}")
+    logger.info(
+        f"\n{'='*80}\n"
+        f"Re-extracting letter for: {company_name} / {year}\n"
+        f"PDF: {pdf_path.name} ({size_mb:.1f} MB)\n"
+        f"{'='*80}"
+    )
     
-    # Skip extremely large PDFs (>100MB) to avoid memory issues
-    if size_mb > 100:
+    # Skip extremely large PDFs (>100MB) to avoid memory issues; main()
+    # already leaves these out, this guards direct callers
+    if size_mb > MAX_PDF_SIZE_MB:
         logger.warning(f"  [SKIP] Very large PDF ({size_mb:.1f} MB) - may cause memory issues")
         return False
     
     try:
-        # Step 1: Detect PDF type and extract text (same as main.py)
-        logger.info("Step 1: Detecting PDF type and extracting text...")
+        # Step 1: Detect PDF type (same as main.py)
+        logger.info("Step 1: Detecting PDF type...")
         pdf_type, _ = detect_pdf_type(pdf_path)
         logger.info(f"  PDF type: {pdf_type}")
         
@@ -109,28 +90,42 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
             logger.warning(f"  [SKIP] Scanned PDF - requires OCR (Tesseract not configured)")
             return False
         
-        pages, extraction_stats = extract_text(pdf_path, pdf_type)
-        if not pages:
-            logger.error("  [FAIL] No text extracted from PDF")
-            return False
-        
-        logger.info(f"  Extracted {len(pages)} pages ({extraction_stats['extraction_coverage']:.1f}% coverage)")
-        
-        # Step 2: Use boundary detector to find letter section
-        logger.info("Step 2: Detecting letter boundary from PDF layout...")
-        detector = SectionBoundaryDetector(pdf_path)
-        detector.extract_layout_metadata()
-        boundaries = detector.detect_section_boundaries()
-        
-        letter_boundary = boundaries.get("letter_to_stakeholders")
-        
-        if not letter_boundary:
-            logger.info("  [SKIP] Letter section not detected in PDF")
-            return False
-        
-        logger.info(f"  [OK] Letter found: pages {letter_boundary.start_page}-{letter_boundary.end_page}, "
-                   f"confidence={letter_boundary.confidence:.2f}")
-        logger.info(f"  Heading: '{letter_boundary.start_heading}'")
+        # Open the PDF once: the boundary detector and text extraction share
+        # the same pdfplumber document, so each page is only parsed once
+        with pdfplumber.open(pdf_path) as pdf:
+            # Step 2: Find the letter first, so PDFs without one skip text extraction
+            logger.info("Step 2: Detecting letter boundary from PDF layout...")
+            detector = SectionBoundaryDetector(pdf_path, pdf)
+            detector.extract_layout_metadata()
+            
+            # Detection only needs the text blocks now; drop the chars and
+            # objects cached on every page so a large PDF doesn't keep them
+            # alive through text extraction
+            for page in pdf.pages:
+                page.close()
+            
+            boundaries = detector.detect_section_boundaries()
+            
+            letter_boundary = boundaries.get("letter_to_stakeholders")
+            
+            if not letter_boundary:
+                logger.info("  [SKIP] Letter section not detected in PDF")
+                return False
+            
+            logger.info(f"  [OK] Letter found: pages {letter_boundary.start_page}-{letter_boundary.end_page}, "
+                       f"confidence={letter_boundary.confidence:.2f}")
+            logger.info(f"  Heading: '{letter_boundary.start_heading}'")
+            
+            # Extract text only for the letter's pages
+            end_page = letter_boundary.end_page or len(pdf.pages)
+            pages, extraction_stats = extract_text(
+                pdf_path, pdf_type, pdf, page_range=(letter_boundary.start_page, end_page)
+            )
+            if not pages:
+                logger.error("  [FAIL] No text extracted from PDF")
+                return False
+            
+            logger.info(f"  Extracted {len(pages)} pages ({extraction_stats['extraction_coverage']:.1f}% coverage)")
         
         # Step 3: Extract letter content (same as main.py)
         logger.info("Step 3: Extracting letter content...")
@@ -161,34 +156,7 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
         # Step 5: Update metadata
         logger.info("Step 5: Updating sections_metadata.json...")
         metadata_path = sections_dir / "sections_metadata.json"
-        if metadata_path.exists():
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-        
-        metadata["letter_to_stakeholders"] = {
-            "boundary": {
-                "section_type": letter_boundary.section_type.value,
-                "start_page": letter_boundary.start_page,
-                "end_page": letter_boundary.end_page,
-                "confidence": letter_boundary.confidence,
-                "start_heading": letter_boundary.start_heading,
-                "detection_method": letter_boundary.detection_method
-            },
-            "content_stats": {
-                "section_type": letter_content.section_type.value,
-                "start_page": letter_content.start_page,
-                "end_page": letter_content.end_page,
-                "character_count": letter_content.character_count,
-                "page_count": letter_content.page_count
-            },
-            "extracted": True,
-            "extraction_date": datetime.now().isoformat()
-        }
-        
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        update_sections_metadata(metadata_path, [(letter_boundary, letter_content)])
         
         logger.info(f"[SUCCESS] Re-extracted letter for {company_name} / {year}")
         return True
@@ -198,6 +166,15 @@ def reextract_letter(company_name: str, year: str, output_dir: Path, pdf_path: P
         return False
 
 
+def _reextract_worker(*args) -> bool:
+    """Pool entry point: re-extract one report, then flush its buffered log lines"""
+    try:
+        return reextract_letter(*args)
+    finally:
+        # Pool workers exit without running logging's atexit flush
+        file_log_buffer.flush()
+
+
 def main():
     logger.info("="*80)
     logger.info("Letter Re-extraction Script (Smart - Small PDFs First)")
@@ -205,7 +182,7 @@ def main():
     
     # Find reports without letters
     logger.info("\nScanning for reports without letters...")
-    reports = find_reports_without_letters()
+    reports = scan_reports_without_letters(include_sizes=True)
     
     logger.info(f"\nFound {len(reports)} reports without letters")
     
@@ -222,6 +199,12 @@ def main():
     # Filter to only large files (>20MB)
     reports = [r for r in reports if r[4] > 20]
     
+    # Drop very large PDFs before queueing so no worker is started for them
+    skipped_large = [(r[0], r[1]) for r in reports if r[4] > MAX_PDF_SIZE_MB]
+    reports = [r for r in reports if r[4] <= MAX_PDF_SIZE_MB]
+    if skipped_large:
+        logger.info(f"Skipping {len(skipped_large)} very large reports (>{MAX_PDF_SIZE_MB} MB)")
+    
     if not reports:
         logger.info("No large reports to process!")
         return
@@ -238,18 +221,46 @@ def main():
     results = {
         "success": [],
         "not_found": [],
-        "skipped_large": []
+        "skipped_large": skipped_large
     }
     
-    for i, (company_name, year, output_dir, pdf_path, size_mb) in enumerate(reports, 1):
-        logger.info(f"\nProcessing {i}/{len(reports)}")
-        
-        success = reextract_letter(company_name, year, output_dir, pdf_path, size_mb)
+    # Reports are independent and PDF parsing is CPU-bound, so fan out
+    # across processes. Each size bucket gets its own pool so large PDFs
+    # (more RAM per worker) run fewer at a time without stalling small ones;
+    # results from all pools are collected as they finish.
+    executors = []
+    futures = {}
+    try:
+        for (low, high), workers in zip(SIZE_BUCKETS_MB, _bucket_workers()):
+            bucket = [r for r in reports if low < r[4] <= high]
+            if not bucket:
+                continue
+            
+            # Forked workers inherit the buffer; write out the parent's pending
+            # records first so no worker writes them to the log file again
+            file_log_buffer.flush()
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+            executors.append(executor)
+            for company_name, year, output_dir, pdf_path, size_mb in bucket:
+                future = executor.submit(_reextract_worker, company_name, year, output_dir, pdf_path, size_mb)
+                futures[future] = (company_name, year)
         
-        if success:
-            results["success"].append((company_name, year))
-        else:
-            results["not_found"].append((company_name, year))
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Re-extracting letters", unit="report"):
+            company_name, year = futures[future]
+            
+            try:
+                success = future.result()
+            except Exception as e:
+                logger.error(f"[ERROR] Worker failed for {company_name} / {year}: {e}")
+                success = False
+            
+            if success:
+                results["success"].append((company_name, year))
+            else:
+                results["not_found"].append((company_name, year))
+    finally:
+        for executor in executors:
+            executor.shutdown()
     
     # Summary
     logger.info("\n" + "="*80)
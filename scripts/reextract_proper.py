@@ -3,16 +3,20 @@ Re-run original pipeline on reports with missing or low-quality sections.
 Uses the proper PDF-based extraction with layout analysis.
 """
 import sys
-import json
+import os
+import orjson
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from tqdm import tqdm
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.config import OUTPUT_DIR
 import logging
 
-# DATA_DIR is one level up from project root
-DATA_DIR = Path(__file__).parent.parent / "data"
+from scripts._reextract_common import build_company_index, lookup_pdf, worker_context
 
 from main import process_single_pdf
 
@@ -22,73 +26,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Byte pattern probed before parsing a section JSON in full
+DOCX_METHOD_MARKER = b'"docx_keyword_matching"'
+
 
 def find_reports_needing_reextraction():
     """Find reports with missing or low-quality section extractions"""
     to_reextract = []
+    company_index = None  # Built on first lookup
     
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-            
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
+    # scandir entries carry d_type, so the is_dir checks need no stat call
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
                 continue
-                
-            sections_dir = year_dir / "sections"
-            if not sections_dir.exists():
-                continue
-            
-            needs_reextraction = False
-            reasons = []
+            company_dir = Path(company_entry.path)
             
-            # Check both section types
-            for section_name in ["mdna", "letter_to_stakeholders"]:
-                json_file = sections_dir / f"{section_name}.json"
-                
-                if not json_file.exists():
-                    reasons.append(f"missing_{section_name}")
-                    needs_reextraction = True
-                else:
-                    # Check if it's a low-quality extraction
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    # One listing of sections/ answers every exists() check below
+                    sections_dir = Path(year_entry.path) / "sections"
                     try:
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        # Check for DOCX-based extractions (likely low quality)
-                        if data.get('extraction_method') == 'docx_keyword_matching':
-                            char_count = data.get('character_count', 0)
-                            if char_count < 2000:  # Suspiciously short
-                                reasons.append(f"low_quality_{section_name}_{char_count}chars")
-                                needs_reextraction = True
-                    except Exception as e:
-                        logger.error(f"Error reading {json_file}: {e}")
-            
-            if needs_reextraction:
-                # Find corresponding PDF
-                company_name = company_dir.name
-                year = year_dir.name
-                
-                # Search for PDF in data directory
-                pdf_found = None
-                for data_company_dir in DATA_DIR.iterdir():
-                    if not data_company_dir.is_dir():
+                        with os.scandir(sections_dir) as it:
+                            section_files = {entry.name for entry in it}
+                    except FileNotFoundError:
                         continue
-                    if company_name.lower() in data_company_dir.name.lower():
-                        for pdf_file in data_company_dir.glob(f"**/*{year}*.pdf"):
-                            pdf_found = pdf_file
-                            break
-                    if pdf_found:
-                        break
-                
-                if pdf_found:
-                    to_reextract.append({
-                        "company": company_name,
-                        "year": year,
-                        "pdf_path": pdf_found,
-                        "output_dir": company_dir / year,
-                        "reasons": reasons
-                    })
+                    
+                    needs_reextraction = False
+                    reasons = []
+                    
+                    # Check both section types
+                    for section_name in ["mdna", "letter_to_stakeholders"]:
+                        json_file = sections_dir / f"{section_name}.json"
+                        
+                        if json_file.name not in section_files:
+                            reasons.append(f"missing_{section_name}")
+                            needs_reextraction = True
+                        else:
+                            # Check if it's a low-quality extraction
+                            try:
+                                with open(json_file, 'rb') as f:
+                                    raw = f.read()
+                                
+                                # Check for DOCX-based extractions (likely low quality).
+                                # Only files mentioning the method are worth parsing.
+                                if DOCX_METHOD_MARKER not in raw:
+                                    continue
+                                data = orjson.loads(raw)
+                                if data.get('extraction_method') == 'docx_keyword_matching':
+                                    char_count = data.get('character_count', 0)
+                                    if char_count < 2000:  # Suspiciously short
+                                        reasons.append(f"low_quality_{section_name}_{char_count}chars")
+                                        needs_reextraction = True
+                            except Exception as e:
+                                logger.error(f"Error reading {json_file}: {e}")
+                    
+                    if needs_reextraction:
+                        # Find corresponding PDF
+                        company_name = company_entry.name
+                        year = year_entry.name
+                        
+                        # Search the indexed data folders for a matching PDF
+                        if company_index is None:
+                            company_index = build_company_index()
+                        pdf_found = lookup_pdf(company_name, year, company_index, short_year=False)
+                        
+                        if pdf_found:
+                            to_reextract.append({
+                                "company": company_name,
+                                "year": year,
+                                "pdf_path": pdf_found,
+                                "output_dir": company_dir / year,
+                                "reasons": reasons
+                            })
     
     return to_reextract
 
@@ -128,27 +141,36 @@ def main():
     success = 0
     errors = 0
     
-    for i, report in enumerate(reports, 1):
-        logger.info(f"\n[{i}/{len(reports)}] {report['company']} - {report['year']}")
-        logger.info(f"  Reasons: {', '.join(report['reasons'])}")
-        
-        try:
-            # Run original pipeline
-            result = process_single_pdf(
+    # Each report runs the full pipeline independently, so fan out across
+    # processes and collect results as they finish
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=worker_context()) as executor:
+        futures = {
+            executor.submit(
+                process_single_pdf,
                 pdf_path=report['pdf_path'],
                 company_name=report['company'],
                 year=report['year']
-            )
+            ): report
+            for report in reports
+        }
+        
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Re-running pipeline", unit="report"):
+            report = futures[future]
+            logger.info(f"\n{report['company']} - {report['year']}")
+            logger.info(f"  Reasons: {', '.join(report['reasons'])}")
             
-            if result['success']:
-                logger.info(f"  ✓ Successfully re-extracted")
-                success += 1
-            else:
-                logger.error(f"  ✗ Failed: {result.get('error', 'Unknown error')}")
+            try:
+                result = future.result()
+                
+                if result['success']:
+                    logger.info(f"  ✓ Successfully re-extracted")
+                    success += 1
+                else:
+                    logger.error(f"  ✗ Failed: {result.get('error', 'Unknown error')}")
+                    errors += 1
+            except Exception as e:
+                logger.error(f"  ✗ Error: {e}", exc_info=True)
                 errors += 1
-        except Exception as e:
-            logger.error(f"  ✗ Error: {e}", exc_info=True)
-            errors += 1
     
     logger.info("\n" + "=" * 80)
     logger.info(f"Summary:")
@@ -2,18 +2,23 @@
 Re-extract MD&A and/or Letter to Stakeholders for reports missing them.
 Only extracts sections that are missing - preserves existing extractions.
 """
+import functools
+import os
+import re
 import sys
 import json
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.config import OUTPUT_DIR, DATA_DIR
 from pipeline.section_boundary_detector import SectionBoundaryDetector
 from pipeline.section_content_extractor import SectionContentExtractor
 from pipeline.extract_text import extract_text
 from pipeline.detect_pdf_type import detect_pdf_type
+from scripts._reextract_common import SECTION_FILES, build_company_index, entry_names
 import logging
 
 logging.basicConfig(
@@ -23,85 +28,124 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def find_reports_missing_sections():
-    """Find all reports missing MD&A and/or Letter to Stakeholders"""
-    missing = []
+def build_pdf_index():
+    """
+    Index the data directory's PDFs by company folder (see build_company_index).
+    
+    Returns:
+        List of (casefolded folder name, [(lowercased pdf stem, pdf path)])
+    """
+    return [
+        (folder_name, [(stem.lower(), Path(pdf_path)) for stem, pdf_path in pdfs])
+        for folder_name, pdfs in build_company_index()
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _year_pattern(year_str):
+    """
+    Compiled regex marking a PDF name as belonging to year_str.
     
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
+    Matches the year between "_" / "-" separators, e.g. "_2019_" or
+    "-2019-". Financial-year names like "_2019_20" or "-2019-20" always
+    contain such a match, so they need no pattern of their own.
+    """
+    return re.compile(f"[_-]{re.escape(year_str)}[_-]")
+
+
+def find_pdf_in_index(pdf_index, company_name, year_str):
+    """
+    Find the PDF for a report in an index from build_pdf_index().
+    
+    A data folder matches when its name starts with the company name
+    (e.g. "(1) 360 ONE WAM LTD.-20251230T101729Z-1-001").
+    
+    Returns:
+        Path to the first PDF whose name contains the year, or None
+    """
+    company_key = company_name.casefold()
+    year_re = _year_pattern(year_str)
+    
+    for folder_name, pdfs in pdf_index:
+        if not folder_name.startswith(company_key):
             continue
-            
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
-                continue
-                
-            sections_dir = year_dir / "sections"
-            mdna_file = sections_dir / "mdna.json"
-            letter_file = sections_dir / "letter_to_stakeholders.json"
-            report_json = year_dir / "report.json"
-            
-            # Check if report exists and has sections dir
-            if not report_json.exists() or not sections_dir.exists():
+        
+        for pdf_stem, pdf_file in pdfs:
+            if year_re.search(pdf_stem):
+                return pdf_file
+    
+    return None
+
+
+def find_reports_missing_sections():
+    """Yield each report missing MD&A and/or Letter to Stakeholders"""
+    pdf_index = None  # Built on first lookup
+    
+    # One listing per year dir and one per sections/ answer every
+    # existence check, with no Path objects or stat calls per file
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
                 continue
             
-            # Check what's missing
-            missing_sections = []
-            if not mdna_file.exists():
-                missing_sections.append("mdna")
-            if not letter_file.exists():
-                missing_sections.append("letter")
-            
-            if missing_sections:
-                # Find the PDF file in data directory
-                company_name = company_dir.name
-                data_dir = Path(__file__).parent.parent / "data"
-                
-                # Search for matching company folder in data dir
-                matching_folders = list(data_dir.glob(f"{company_name}*"))
-                
-                for company_data_dir in matching_folders:
-                    if not company_data_dir.is_dir():
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
                         continue
                     
-                    # Find PDFs in this company folder (recursively)
-                    pdf_files = list(company_data_dir.glob("**/*.pdf"))
-                    for pdf_file in pdf_files:
-                        # Check if this PDF matches the year
-                        pdf_stem = pdf_file.stem.lower()
-                        year_str = year_dir.name
-                        
-                        # Try different year patterns
-                        year_patterns = [
-                            f"_{year_str}_",
-                            f"_{year_str}-",
-                            f"-{year_str}_",
-                            f"-{year_str}-",
-                        ]
-                        
-                        # For financial years like 2019_20
-                        if year_str.isdigit() and len(year_str) == 4:
-                            next_year_short = str(int(year_str) + 1)[2:]
-                            year_patterns.extend([
-                                f"_{year_str}_{next_year_short}",
-                                f"_{year_str}-{next_year_short}",
-                                f"-{year_str}_{next_year_short}",
-                                f"-{year_str}-{next_year_short}",
-                            ])
+                    section_files = entry_names(os.path.join(year_entry.path, "sections"))
+                    
+                    # Fully extracted reports need no further checks
+                    if SECTION_FILES <= section_files:
+                        continue
+                    
+                    year_files = entry_names(year_entry.path)
+                    
+                    # Check if report exists and has sections dir
+                    if "report.json" not in year_files or "sections" not in year_files:
+                        continue
+                    
+                    # Check what's missing
+                    missing_sections = []
+                    if "mdna.json" not in section_files:
+                        missing_sections.append("mdna")
+                    if "letter_to_stakeholders.json" not in section_files:
+                        missing_sections.append("letter")
+                    
+                    if missing_sections:
+                        # Find the PDF file in data directory
+                        company_name = company_entry.name
+                        if pdf_index is None:
+                            pdf_index = build_pdf_index()
                         
-                        if any(pattern in pdf_stem for pattern in year_patterns):
-                            missing.append({
-                                "company": company_dir.name,
-                                "year": year_dir.name,
+                        pdf_file = find_pdf_in_index(pdf_index, company_name, year_entry.name)
+                        if pdf_file:
+                            yield {
+                                "company": company_name,
+                                "year": year_entry.name,
                                 "pdf_path": pdf_file,
-                                "output_dir": year_dir,
+                                "output_dir": Path(year_entry.path),
                                 "missing_sections": missing_sections
-                            })
-                            break
-                    
-                    if missing and missing[-1]["company"] == company_name:
-                        break
+                            }
+
+
+@functools.lru_cache(maxsize=32)
+def _extract_pages(pdf_path_str):
+    """
+    Detect PDF type and extract text, cached so reports sharing a PDF parse it once.
     
-    return missing
+    Returns:
+        Tuple of (pdf_type, pages)
+    """
+    pdf_path = Path(pdf_path_str)
+    
+    logger.info(f"  Step 1: Detecting PDF type...")
+    pdf_type = detect_pdf_type(pdf_path)
+    logger.info(f"  PDF type: {pdf_type}")
+    
+    logger.info(f"  Step 2: Extracting text from PDF...")
+    pages, _ = extract_text(pdf_path, pdf_type)
+    return pdf_type, pages
 
 
 def reextract_sections_for_report(report_info):
@@ -127,13 +171,8 @@ def reextract_sections_for_report(report_info):
         return {"success": False, "error": "pdf_not_found"}
     
     try:
-        # Step 1: Detect PDF type and extract text
-        logger.info(f"  Step 1: Detecting PDF type...")
-        pdf_type = detect_pdf_type(pdf_path)
-        logger.info(f"  PDF type: {pdf_type}")
-        
-        logger.info(f"  Step 2: Extracting text from PDF...")
-        pages, _ = extract_text(pdf_path, pdf_type)
+        # Step 1-2: Detect PDF type and extract text
+        pdf_type, pages = _extract_pages(str(pdf_path))
         if not pages:
             logger.error(f"  Failed to extract text from PDF")
             return {"success": False, "error": "text_extraction_failed"}
@@ -194,13 +233,28 @@ def reextract_sections_for_report(report_info):
 
 def main():
     """Main function to re-extract missing sections"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Re-extract missing MD&A and Letter to Stakeholders sections")
+    parser.add_argument("-y", "--yes", action="store_true", help="Proceed without asking for confirmation (for unattended runs)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the reports that would be processed")
+    args = parser.parse_args()
+    
     logger.info("=" * 80)
     logger.info("Re-extracting Missing MD&A and Letter to Stakeholders")
     logger.info("=" * 80)
     
     # Find reports with missing sections
     logger.info("Scanning for reports with missing sections...")
-    missing_reports = find_reports_missing_sections()
+    # Collected up front: the counts and confirmation prompt need the total
+    missing_reports = list(find_reports_missing_sections())
+    
+    # Keep reports that share a PDF next to each other (in first-seen order)
+    # so the cached parse is reused and can be dropped once they are done
+    pdf_order = {}
+    for r in missing_reports:
+        pdf_order.setdefault(r["pdf_path"], len(pdf_order))
+    missing_reports.sort(key=lambda r: pdf_order[r["pdf_path"]])
     
     if not missing_reports:
         logger.info("All reports have both MD&A and Letter extracted. Nothing to do.")
@@ -215,15 +269,20 @@ def main():
     logger.info(f"  Reports missing Letter: {letter_missing}")
     logger.info(f"  Total reports to process: {len(missing_reports)}")
     
+    if args.dry_run:
+        logger.info("Dry run - no changes made.")
+        return
+    
     # Ask for confirmation
     print(f"\nAbout to re-extract sections for {len(missing_reports)} reports.")
     print("This will only extract sections that are missing.")
     print("Existing extractions will not be affected.")
-    response = input("\nProceed? (y/n): ")
-    
-    if response.lower() != 'y':
-        logger.info("Aborted by user.")
-        return
+    if not args.yes:
+        response = input("\nProceed? (y/n): ")
+        
+        if response.lower() != 'y':
+            logger.info("Aborted by user.")
+            return
     
     # Re-extract
     logger.info("\nStarting re-extraction...")
@@ -256,6 +315,10 @@ def main():
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
             stats["errors"] += 1
+        
+        # Drop the cached parse once no later report uses this PDF
+        if i == len(missing_reports) or missing_reports[i]["pdf_path"] != report_info["pdf_path"]:
+            _extract_pages.cache_clear()
     
     # Summary
     logger.info("\n" + "=" * 80)
@@ -2,115 +2,169 @@
 Re-process reports with missing sections using the enhanced patterns.
 Deletes incomplete outputs and re-runs the full PDF pipeline.
 """
+import functools
+import os
 import sys
 from pathlib import Path
 import shutil
 import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.config import OUTPUT_DIR
 from main import process_single_pdf
+from scripts._reextract_common import SECTION_FILES, build_company_index, worker_context
 import logging
 
-# Correct DATA_DIR - it's at project root, not in config
-DATA_DIR = Path(__file__).parent.parent / "data"
-
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+DELETE_WORKERS = 8
 
-def find_pdf_for_report(company_name, year):
-    """Find the PDF file for a given company and year"""
+# Numbered company prefix in output folder names, e.g. "(1) 360 ONE WAM LTD"
+COMPANY_PREFIX_RE = re.compile(r'\(\d+\)\s*(.+)')
+
+
+def _safe_rmtree(path: Path) -> Optional[Exception]:
+    """Delete a directory tree, returning the error instead of raising it."""
+    try:
+        shutil.rmtree(path)
+    except Exception as e:
+        return e
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _company_index():
+    """The data directory's PDF index, built (or loaded) once per run"""
+    return build_company_index()
+
+
+@functools.lru_cache(maxsize=None)
+def _company_pdfs(company_name):
+    """(stem, path) lists of the data folders matching a company, looked up once per company"""
     # Extract company name without number prefix
     # E.g., "(1) 360 ONE WAM LTD" -> "360 ONE WAM LTD"
-    match = re.match(r'\(\d+\)\s*(.+)', company_name)
+    match = COMPANY_PREFIX_RE.match(company_name)
     if match:
         clean_company_name = match.group(1).strip()
     else:
         clean_company_name = company_name
     
-    # Search for matching company folder in data directory
     # Data folders have format like: "(1) 360 ONE WAM LTD.-20251230T101729Z-1-001"
-    for data_folder in DATA_DIR.iterdir():
-        if not data_folder.is_dir():
-            continue
-        
-        # Check if this folder matches the company
-        if clean_company_name.upper() in data_folder.name.upper():
-            # Search for PDF with matching year
-            pdf_files = list(data_folder.rglob(f"*{year}*.pdf"))
-            if pdf_files:
-                return pdf_files[0]
+    company_key = clean_company_name.casefold()
+    return tuple(pdfs for folder_name, pdfs in _company_index() if company_key in folder_name)
+
+
+def find_pdf_for_report(company_name, year):
+    """Find the PDF file for a given company and year"""
+    # Search the matching company folders in the data directory
+    for pdfs in _company_pdfs(company_name):
+        # Search for PDF with matching year
+        for stem, pdf_path in pdfs:
+            if year in stem:
+                return Path(pdf_path)
     
     return None
 
 
-def find_incomplete_reports():
-    """Find all reports with missing MD&A or Letter sections"""
-    incomplete = []
+def find_incomplete_reports(section_counts=None):
+    """
+    Yield each report with missing MD&A or Letter sections.
     
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-        
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
-                continue
-            
-            sections_dir = year_dir / "sections"
-            if not sections_dir.exists():
+    Args:
+        section_counts: Optional {"mdna": int, "letter": int} dict, incremented
+            for every scanned report (complete or not) that has that section
+    """
+    # scandir entries carry d_type, and one listing of sections/ answers
+    # both existence checks without a stat call per file
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
                 continue
             
-            mdna_missing = not (sections_dir / "mdna.json").exists()
-            letter_missing = not (sections_dir / "letter_to_stakeholders.json").exists()
-            
-            if mdna_missing or letter_missing:
-                missing = []
-                if mdna_missing:
-                    missing.append("mdna")
-                if letter_missing:
-                    missing.append("letter")
-                
-                incomplete.append({
-                    "company": company_dir.name,
-                    "year": year_dir.name,
-                    "year_dir": year_dir,
-                    "missing": missing
-                })
-    
-    return incomplete
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    try:
+                        with os.scandir(os.path.join(year_entry.path, "sections")) as it:
+                            section_files = {entry.name for entry in it}
+                    except (FileNotFoundError, NotADirectoryError):
+                        continue
+                    
+                    if section_counts is not None:
+                        section_counts["mdna"] += "mdna.json" in section_files
+                        section_counts["letter"] += "letter_to_stakeholders.json" in section_files
+                    
+                    # Fully extracted reports need no further checks
+                    if SECTION_FILES <= section_files:
+                        continue
+                    
+                    mdna_missing = "mdna.json" not in section_files
+                    letter_missing = "letter_to_stakeholders.json" not in section_files
+                    
+                    if mdna_missing or letter_missing:
+                        missing = []
+                        if mdna_missing:
+                            missing.append("mdna")
+                        if letter_missing:
+                            missing.append("letter")
+                        
+                        yield {
+                            "company": company_entry.name,
+                            "year": year_entry.name,
+                            "year_dir": Path(year_entry.path),
+                            "missing": missing
+                        }
+
+
+def _reprocess_one(report):
+    """Run the full pipeline for one report in a worker; returns (report, result)"""
+    try:
+        result = process_single_pdf(report['pdf_path'])
+    except Exception as e:
+        result = {"status": "failed", "error": str(e)}
+    return report, result
 
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Delete incomplete outputs and re-run the full pipeline for them")
+    parser.add_argument("-y", "--yes", action="store_true", help="Proceed without asking for confirmation (for unattended runs)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the reports that would be processed")
+    args = parser.parse_args()
+    
     logger.info("=" * 80)
     logger.info("Re-processing Reports with Enhanced Patterns")
     logger.info("=" * 80)
     
-    # Find incomplete reports
+    # Find incomplete reports and match them to PDFs in one pass over the
+    # scan, keeping only the reports that will be processed
     logger.info("Scanning for reports with missing sections...")
-    incomplete_reports = find_incomplete_reports()
-    
-    if not incomplete_reports:
-        logger.info("No reports with missing sections found!")
-        return
-    
-    mdna_missing = sum(1 for r in incomplete_reports if "mdna" in r['missing'])
-    letter_missing = sum(1 for r in incomplete_reports if "letter" in r['missing'])
-    
-    logger.info(f"\nFound {len(incomplete_reports)} reports with missing sections:")
-    logger.info(f"  Missing MD&A: {mdna_missing}")
-    logger.info(f"  Missing Letter: {letter_missing}")
-    
-    # Match to PDFs
-    logger.info("\nMatching reports to PDF files...")
     reports_to_process = []
     not_found = []
+    incomplete_count = 0
+    mdna_missing = 0
+    letter_missing = 0
+    # Sections on disk across all reports, kept current through the run so
+    # the final counts need no second scan of OUTPUT_DIR
+    section_counts = {"mdna": 0, "letter": 0}
     
-    for report in incomplete_reports:
+    for report in find_incomplete_reports(section_counts):
+        incomplete_count += 1
+        mdna_missing += "mdna" in report['missing']
+        letter_missing += "letter" in report['missing']
+        
         pdf_path = find_pdf_for_report(report['company'], report['year'])
         if pdf_path:
             reports_to_process.append({
@@ -120,6 +174,14 @@ def main():
         else:
             not_found.append(f"{report['company']} - {report['year']}")
     
+    if not incomplete_count:
+        logger.info("No reports with missing sections found!")
+        return
+    
+    logger.info(f"\nFound {incomplete_count} reports with missing sections:")
+    logger.info(f"  Missing MD&A: {mdna_missing}")
+    logger.info(f"  Missing Letter: {letter_missing}")
+    
     logger.info(f"  ✓ Found PDFs for {len(reports_to_process)} reports")
     if not_found:
         logger.warning(f"  ⚠ Could not find PDFs for {len(not_found)} reports")
@@ -136,15 +198,20 @@ def main():
     for r in reports_to_process[:10]:
         logger.info(f"  {r['company']} - {r['year']}: missing {', '.join(r['missing'])}")
     
+    if args.dry_run:
+        logger.info("Dry run - no changes made.")
+        return
+    
     print(f"\nWARNING: This will:")
     print(f"  1. DELETE output folders for {len(reports_to_process)} incomplete reports")
     print(f"  2. Re-run the FULL PIPELINE with enhanced patterns")
     print(f"  3. Process {len(reports_to_process)} PDF files")
-    response = input("\nProceed? (y/n): ")
-    
-    if response.lower() != 'y':
-        logger.info("Aborted by user.")
-        return
+    if not args.yes:
+        response = input("\nProceed? (y/n): ")
+        
+        if response.lower() != 'y':
+            logger.info("Aborted by user.")
+            return
     
     # Delete incomplete outputs
     logger.info("\n" + "=" * 80)
@@ -152,13 +219,19 @@ def main():
     logger.info("=" * 80)
     
     deleted = 0
-    for report in reports_to_process:
-        try:
-            shutil.rmtree(report['year_dir'])
-            deleted += 1
-            logger.info(f"  ✓ Deleted: {report['company']}/{report['year']}")
-        except Exception as e:
-            logger.error(f"  ✗ Error: {report['company']}/{report['year']}: {e}")
+    
+    # rmtree is syscall-bound and releases the GIL, so threads overlap the I/O
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        errors = executor.map(_safe_rmtree, (r['year_dir'] for r in reports_to_process))
+        for report, error in zip(reports_to_process, errors):
+            if error is None:
+                deleted += 1
+                for section in ("mdna", "letter"):
+                    if section not in report['missing']:
+                        section_counts[section] -= 1
+                logger.info(f"  ✓ Deleted: {report['company']}/{report['year']}")
+            else:
+                logger.error(f"  ✗ Error: {report['company']}/{report['year']}: {error}")
     
     logger.info(f"\n✅ Deleted {deleted} incomplete output folders")
     
@@ -170,60 +243,52 @@ def main():
     success = 0
     errors = 0
     
-    for i, report in enumerate(reports_to_process, 1):
-        logger.info(f"\n[{i}/{len(reports_to_process)}] Processing {report['company']} - {report['year']}")
-        logger.info(f"  PDF: {report['pdf_path'].name}")
-        
+    # Reports are independent and CPU-bound, so run them in worker
+    # processes; results stream back as each finishes and are tallied here
+    with worker_context().Pool(processes=os.cpu_count()) as pool:
         try:
-            result = process_single_pdf(report['pdf_path'])
-            
-            if result and result.get('status') == 'success':
-                success += 1
-                
-                # Check what got extracted
-                output_dir = OUTPUT_DIR / report['company'] / report['year'] / "sections"
-                extracted = []
-                if (output_dir / "mdna.json").exists():
-                    extracted.append("MD&A")
-                if (output_dir / "letter_to_stakeholders.json").exists():
-                    extracted.append("Letter")
+            results = pool.imap_unordered(_reprocess_one, reports_to_process, chunksize=1)
+            for i, (report, result) in enumerate(results, 1):
+                logger.info(f"\n[{i}/{len(reports_to_process)}] Processed {report['company']} - {report['year']}")
+                logger.info(f"  PDF: {report['pdf_path'].name}")
                 
-                if extracted:
-                    logger.info(f"  ✓ Success - Extracted: {', '.join(extracted)}")
+                if result and result.get('status') == 'success':
+                    success += 1
+                    
+                    # Check what got extracted
+                    output_dir = OUTPUT_DIR / report['company'] / report['year'] / "sections"
+                    extracted = []
+                    if (output_dir / "mdna.json").exists():
+                        extracted.append("MD&A")
+                        section_counts["mdna"] += 1
+                    if (output_dir / "letter_to_stakeholders.json").exists():
+                        extracted.append("Letter")
+                        section_counts["letter"] += 1
+                    
+                    if extracted:
+                        logger.info(f"  ✓ Success - Extracted: {', '.join(extracted)}")
+                    else:
+                        logger.info(f"  ✓ Processed but no sections extracted")
                 else:
-                    logger.info(f"  ✓ Processed but no sections extracted")
-            else:
-                errors += 1
-                error_msg = result.get('error', 'Unknown error') if result else 'No result'
-                logger.warning(f"  ✗ Failed: {error_msg}")
-                
-        except Exception as e:
-            errors += 1
-            logger.error(f"  ✗ Error: {e}")
+                    errors += 1
+                    error_msg = result.get('error', 'Unknown error') if result else 'No result'
+                    logger.warning(f"  ✗ Failed: {error_msg}")
+        except KeyboardInterrupt:
+            # Stop the workers but still report the reports finished so far
+            logger.warning("Interrupted - stopping workers")
+            pool.terminate()
     
     # Final summary
     logger.info("\n" + "=" * 80)
     logger.info("FINAL SUMMARY")
     logger.info("=" * 80)
-    logger.info(f"Reports processed: {len(reports_to_process)}")
+    logger.info(f"Reports processed: {success + errors}/{len(reports_to_process)}")
     logger.info(f"  ✓ Success: {success}")
     logger.info(f"  ✗ Errors: {errors}")
     
     # Check new extraction counts
-    mdna_count = 0
-    letter_count = 0
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
-                continue
-            sections_dir = year_dir / "sections"
-            if sections_dir.exists():
-                if (sections_dir / "mdna.json").exists():
-                    mdna_count += 1
-                if (sections_dir / "letter_to_stakeholders.json").exists():
-                    letter_count += 1
+    mdna_count = section_counts["mdna"]
+    letter_count = section_counts["letter"]
     
     logger.info(f"\nNew extraction counts:")
     logger.info(f"  MD&A: {mdna_count}/239 ({mdna_count/239*100:.1f}%)")
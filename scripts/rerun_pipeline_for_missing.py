@@ -2,12 +2,16 @@
 Re-run the original PDF pipeline for reports with missing MD&A or Letter sections.
 Uses the full pipeline logic with PDF analysis, not simple keyword matching.
 """
+import os
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config.config import OUTPUT_DIR, DATA_DIR
+from config.config import OUTPUT_DIR
 from main import process_single_pdf
+from scripts._reextract_common import SECTION_FILES, build_company_index, worker_context
 import logging
 
 logging.basicConfig(
@@ -20,52 +24,88 @@ logger = logging.getLogger(__name__)
 def find_pdfs_for_missing_sections():
     """Find PDFs that need re-processing due to missing sections"""
     to_process = []
+    company_index = None  # Built (or loaded) on first missing report
     
-    for company_dir in OUTPUT_DIR.iterdir():
-        if not company_dir.is_dir():
-            continue
-        
-        company_name = company_dir.name
-        
-        for year_dir in company_dir.iterdir():
-            if not year_dir.is_dir():
+    # scandir entries carry d_type, and one listing of sections/ answers
+    # both existence checks without a stat call per file
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
                 continue
-                
-            year = year_dir.name
-            sections_dir = year_dir / "sections"
             
-            # Check what's missing
-            if not sections_dir.exists():
-                continue
-                
-            mdna_missing = not (sections_dir / "mdna.json").exists()
-            letter_missing = not (sections_dir / "letter_to_stakeholders.json").exists()
+            company_name = company_entry.name
+            company_data_folders = None  # Looked up on first missing year
             
-            if mdna_missing or letter_missing:
-                # Find the original PDF in data directory
-                # Company folder names in data dir have different format
-                company_data_folders = list(DATA_DIR.glob(f"*{company_name.split(')')[1].strip()}*"))
-                
-                if company_data_folders:
-                    # Look for PDF with matching year
-                    for data_folder in company_data_folders:
-                        pdf_files = list(data_folder.glob(f"**/*{year}*.pdf"))
-                        if pdf_files:
-                            to_process.append({
-                                "company": company_name,
-                                "year": year,
-                                "pdf_path": pdf_files[0],
-                                "missing": {
-                                    "mdna": mdna_missing,
-                                    "letter": letter_missing
-                                }
-                            })
-                            break
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    year = year_entry.name
+                    
+                    # Check what's missing
+                    try:
+                        with os.scandir(os.path.join(year_entry.path, "sections")) as it:
+                            section_files = {entry.name for entry in it}
+                    except (FileNotFoundError, NotADirectoryError):
+                        continue
+                    
+                    # Fully extracted reports need no further checks
+                    if SECTION_FILES <= section_files:
+                        continue
+                    
+                    mdna_missing = "mdna.json" not in section_files
+                    letter_missing = "letter_to_stakeholders.json" not in section_files
+                    
+                    if mdna_missing or letter_missing:
+                        # Find the original PDF in data directory
+                        # Company folder names in data dir have different format
+                        if company_data_folders is None:
+                            if company_index is None:
+                                company_index = build_company_index()
+                            company_key = company_name.split(')')[1].strip().casefold()
+                            company_data_folders = [
+                                pdfs for folder_name, pdfs in company_index
+                                if company_key in folder_name
+                            ]
+                        
+                        if company_data_folders:
+                            # Look for PDF with matching year
+                            for pdfs in company_data_folders:
+                                pdf_files = [pdf_path for stem, pdf_path in pdfs if year in stem]
+                                if pdf_files:
+                                    to_process.append({
+                                        "company": company_name,
+                                        "year": year,
+                                        "pdf_path": Path(pdf_files[0]),
+                                        "missing": {
+                                            "mdna": mdna_missing,
+                                            "letter": letter_missing
+                                        }
+                                    })
+                                    break
     
     return to_process
 
 
+def _reprocess_one(report):
+    """Run the full pipeline for one report in a worker; returns (report, result)"""
+    try:
+        # Use the original process_single_pdf function
+        result = process_single_pdf(report['pdf_path'])
+    except Exception as e:
+        result = {"status": "failed", "error": str(e)}
+    return report, result
+
+
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Re-run the full pipeline for reports with missing sections")
+    parser.add_argument("-y", "--yes", action="store_true", help="Proceed without asking for confirmation (for unattended runs)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the reports that would be processed")
+    args = parser.parse_args()
+    
     logger.info("=" * 80)
     logger.info("Re-running Pipeline for Reports with Missing Sections")
     logger.info("=" * 80)
@@ -74,6 +114,13 @@ def main():
     logger.info("Scanning for reports with missing sections...")
     reports = find_pdfs_for_missing_sections()
     
+    # process_single_pdf writes to the output dir named by the PDF, so two
+    # reports matched to the same PDF would run (and write) it twice
+    unique_reports = {}
+    for r in reports:
+        unique_reports.setdefault(r["pdf_path"], r)
+    reports = list(unique_reports.values())
+    
     if not reports:
         logger.info("No reports found with missing sections!")
         return
@@ -91,37 +138,44 @@ def main():
         missing_str = ", ".join([k for k, v in r['missing'].items() if v])
         logger.info(f"  {r['company']} - {r['year']}: missing {missing_str}")
     
-    response = input(f"\nRe-process these {len(reports)} PDFs with full pipeline? (y/n): ")
-    if response.lower() != 'y':
-        logger.info("Aborted by user.")
+    if args.dry_run:
+        logger.info("Dry run - no changes made.")
         return
     
+    if not args.yes:
+        response = input(f"\nRe-process these {len(reports)} PDFs with full pipeline? (y/n): ")
+        if response.lower() != 'y':
+            logger.info("Aborted by user.")
+            return
+    
     logger.info("\nStarting re-processing...")
     logger.info("This will use the FULL PDF pipeline with proper extraction logic.\n")
     
     success = 0
     errors = 0
     
-    for i, report in enumerate(reports, 1):
-        logger.info(f"[{i}/{len(reports)}] Processing {report['company']} - {report['year']}")
-        
+    # Reports are independent and CPU-bound, so run them in worker
+    # processes; results stream back as each finishes and are tallied here
+    with worker_context().Pool(processes=os.cpu_count()) as pool:
         try:
-            # Use the original process_single_pdf function
-            result = process_single_pdf(report['pdf_path'])
-            
-            if result and result.get('status') == 'success':
-                success += 1
-                logger.info(f"  ✓ Success")
-            else:
-                errors += 1
-                logger.warning(f"  ✗ Failed: {result.get('error', 'Unknown error')}")
+            results = pool.imap_unordered(_reprocess_one, reports, chunksize=1)
+            for i, (report, result) in enumerate(results, 1):
+                logger.info(f"[{i}/{len(reports)}] Processed {report['company']} - {report['year']}")
                 
-        except Exception as e:
-            errors += 1
-            logger.error(f"  ✗ Error: {e}")
+                if result and result.get('status') == 'success':
+                    success += 1
+                    logger.info(f"  ✓ Success")
+                else:
+                    errors += 1
+                    logger.warning(f"  ✗ Failed: {result.get('error', 'Unknown error')}")
+        except KeyboardInterrupt:
+            # Stop the workers but still report the PDFs finished so far
+            logger.warning("Interrupted - stopping workers")
+            pool.terminate()
     
     logger.info("\n" + "=" * 80)
     logger.info("Summary:")
+    logger.info(f"  Processed: {success + errors}/{len(reports)}")
     logger.info(f"  ✓ Success: {success}")
     logger.info(f"  ✗ Errors: {errors}")
     logger.info("=" * 80)
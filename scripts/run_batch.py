@@ -1,22 +1,56 @@
 """
 Batch processing script for running the pipeline on a subset of companies.
 """
+import os
 import sys
+import time
 import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from main import process_single_pdf, setup_logging
-from config.config import LOGS_DIR
-import json
+from config.config import LOGS_DIR, LOG_LEVEL
+from scripts._reextract_common import worker_context
+import orjson
 
 # Get correct data directory (workspace level)
 DATA_DIR = Path(__file__).parent.parent / "data"
 
 
+def _init_worker_logging(log_queue):
+    """
+    Worker initializer: send every log record to the parent over log_queue.
+    
+    Forked workers inherit the parent's stdout and log file handlers; writing
+    through those from every process at once contends on the same handles.
+    The parent's QueueListener is the only writer instead.
+    """
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(getattr(logging, LOG_LEVEL))
+
+
+def _process_chunk(pdf_paths):
+    """Process several PDFs in one worker task; an error fails only its own file."""
+    results = []
+    for pdf_path in pdf_paths:
+        try:
+            results.append(process_single_pdf(pdf_path))
+        except Exception as e:
+            results.append({
+                "pdf_path": str(pdf_path),
+                "status": "failed",
+                "error": str(e)
+            })
+    return results
+
+
 def main():
     """Process first N companies from the data directory."""
     import argparse
@@ -24,6 +58,8 @@ def main():
     parser = argparse.ArgumentParser(description="Batch process PDFs for N companies")
     parser.add_argument("--companies", type=int, default=50, help="Number of companies to process (default: 50)")
     parser.add_argument("--start", type=int, default=0, help="Starting company index (default: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=1, help="PDFs sent to a worker per task (default: 1)")
     args = parser.parse_args()
     
     # Setup logging
@@ -60,20 +96,72 @@ def main():
         logger.error("No PDF files found")
         return
     
-    # Process each PDF
-    results = []
-    
-    for pdf_path in tqdm(pdf_files, desc="Processing PDFs", unit="file"):
-        result = process_single_pdf(pdf_path)
-        results.append(result)
+    # Process PDFs in parallel - each one is parsed independently and the
+    # work is CPU-bound. Largest files are queued first so long jobs don't
+    # end up running alone at the end of the batch. Results keep the input
+    # order for the summary.
+    results = [None] * len(pdf_files)
+    order = sorted(range(len(pdf_files)), key=lambda i: os.path.getsize(pdf_files[i]), reverse=True)
+    chunksize = max(1, args.chunksize)
+    chunks = [order[i:i + chunksize] for i in range(0, len(order), chunksize)]
+    
+    # Worker log records are written by the parent's handlers, one at a time
+    mp_context = worker_context()
+    log_queue = mp_context.Queue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    log_listener.start()
+    
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=mp_context,
+        initializer=_init_worker_logging,
+        initargs=(log_queue,)
+    ) as executor:
+        futures = {
+            executor.submit(_process_chunk, [pdf_files[i] for i in chunk]): chunk
+            for chunk in chunks
+        }
+        
+        with tqdm(total=len(pdf_files), desc="Processing PDFs", unit="file", mininterval=0.5) as progress:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                if progress.n == 0:
+                    logger.info(f"First result after {time.perf_counter() - started:.1f}s")
+                
+                try:
+                    for i, result in zip(chunk, future.result()):
+                        results[i] = result
+                except Exception as e:
+                    # A worker that crashes (e.g. on a corrupt PDF) fails only its own chunk
+                    for i in chunk:
+                        logger.error(f"Worker failed for {pdf_files[i]}: {e}")
+                        results[i] = {
+                            "pdf_path": str(pdf_files[i]),
+                            "status": "failed",
+                            "error": str(e)
+                        }
+                progress.update(len(chunk))
+    
+    log_listener.stop()
     
     # Generate summary
     logger.info("\n" + "="*80)
     logger.info("BATCH PROCESSING SUMMARY")
     logger.info("="*80)
     
-    successful = sum(1 for r in results if r["status"] == "success")
-    failed = sum(1 for r in results if r["status"] == "failed")
+    # One pass over the results (skipped files count as neither)
+    successful = 0
+    failed_results = []
+    for r in results:
+        status = r.get("status")
+        if status == "success":
+            successful += 1
+        elif status == "failed":
+            failed_results.append(r)
+    failed = len(failed_results)
     
     logger.info(f"Companies processed: {len(companies_to_process)}")
     logger.info(f"Total PDFs processed: {len(results)}")
@@ -82,14 +170,13 @@ def main():
     
     if failed > 0:
         logger.info("\nFailed files:")
-        for r in results:
-            if r["status"] == "failed":
-                logger.info(f"  - {r['pdf_path']}: {r.get('error', 'Unknown error')}")
+        for r in failed_results:
+            logger.info(f"  - {r['pdf_path']}: {r.get('error', 'Unknown error')}")
     
     # Save summary report
     summary_path = LOGS_DIR / f"batch_summary_{args.companies}companies.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    with open(summary_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     logger.info(f"\nSummary report saved to: {summary_path}")
     
     logger.info("\nBatch processing completed!")
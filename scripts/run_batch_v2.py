@@ -1,65 +1,224 @@
 """
 Batch process PDFs from companies numbered 1-50, with idempotency and error handling.
 """
+import os
 import sys
+import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import re
-import json
+import orjson
+from tqdm import tqdm
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
 from main import process_single_pdf
-from config.config import LOGS_DIR
+from config.config import LOGS_DIR, OUTPUT_DIR
+from pipeline.utils import write_file_atomic
+from scripts._reextract_common import worker_context
 
 # Data directory
-DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Number prefix of a company folder name, e.g. "(10) Company Name"
+COMPANY_NUMBER_RE = re.compile(r'\((\d+)\)')
+
+# File names of known problematic PDFs, skipped temporarily: 3M India Ltd
+# 2019_20 and 2020_21 (company and year may appear in either order)
+KNOWN_PROBLEMATIC_RE = re.compile(r'^(?=.*3M India Ltd)(?=.*(?:2019_20|2020_21))')
+
+# Parallel PDF parsing stops scaling at around 4-6 processes
+MAX_WORKERS = min(os.cpu_count() or 1, 6)
+
+# Directories never walked for PDFs: macOS archive metadata (which holds
+# "._name.pdf" resource forks, not PDFs); hidden directories are skipped too
+SKIP_DIRS = frozenset({"__MACOSX"})
+
+# One result per line for every PDF attempted, appended as each finishes.
+# PDFs listed here are not retried; delete the file to start over.
+PROGRESS_FILE = LOGS_DIR / "batch_progress_15companies.jsonl"
 
 
 def extract_number_from_company_name(company_name: str) -> int:
     """Extract the leading number from company folder name like '(10) Company Name'"""
-    match = re.match(r'\((\d+)\)', company_name)
+    match = COMPANY_NUMBER_RE.match(company_name)
     if match:
         return int(match.group(1))
     return 999999  # Put unnumbered companies at the end
 
 
+def _scan_pdfs(root: str):
+    """Yield the path of every PDF under root, skipping symlinked, hidden and SKIP_DIRS dirs"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(".pdf"):
+                    yield entry.path
+
+
 def get_processed_companies():
     """Get set of companies that have been fully processed (have at least one report.json)"""
-    outputs_dir = Path(__file__).parent.parent / "config" / "outputs"
-    if not outputs_dir.exists():
+    if not OUTPUT_DIR.exists():
         return set()
     
     processed = set()
-    for company_dir in outputs_dir.iterdir():
-        if company_dir.is_dir():
-            # Check if any year subdirectory has report.json
-            has_reports = False
-            for year_dir in company_dir.iterdir():
-                if year_dir.is_dir() and (year_dir / "report.json").exists():
-                    has_reports = True
-                    break
-            if has_reports:
-                processed.add(company_dir.name)
+    # scandir entries carry d_type, so the is_dir checks need no stat call
+    with os.scandir(OUTPUT_DIR) as companies:
+        for company_entry in companies:
+            if not company_entry.is_dir(follow_symlinks=False):
+                continue
+            
+            # Check if any year subdirectory has report.json, reading it from
+            # the year directory's listing
+            with os.scandir(company_entry.path) as years:
+                for year_entry in years:
+                    if not year_entry.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(year_entry.path) as files:
+                        has_report = any(f.name == "report.json" for f in files)
+                    if has_report:
+                        processed.add(company_entry.name)
+                        break
     
     return processed
 
 
+def _load_progress() -> dict:
+    """Return the results recorded in PROGRESS_FILE, keyed by PDF path"""
+    attempted = {}
+    line = b"\n"
+    try:
+        with open(PROGRESS_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    result = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # Line cut short by a crash mid-write
+                attempted[result["pdf_path"]] = result
+    except FileNotFoundError:
+        pass
+    
+    # Terminate a cut-short last line so the next result starts a line
+    if not line.endswith(b"\n"):
+        with open(PROGRESS_FILE, 'ab') as f:
+            f.write(b"\n")
+    
+    return attempted
+
+
+def _bucket_result(results: dict, result: dict) -> None:
+    """Add a process_single_pdf result to its summary bucket"""
+    status = result.get("status", "failed")
+    
+    if status == "success":
+        results["success"].append(result)
+    elif status == "skipped":
+        results["skipped"].append(result)
+    elif "timeout" in (result.get("error") or ""):
+        results["timeout"].append(result)
+    else:
+        results["failed"].append(result)
+
+
+def _prefetch(pdf_path):
+    """
+    Ask the OS to start reading a PDF into the page cache.
+    
+    posix_fadvise returns immediately and the read happens in the
+    background, so a worker that opens the file later doesn't wait on the
+    disk. Where it is unavailable (macOS, Windows) this does nothing.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(pdf_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _init_worker():
+    """Worker initializer: ignore Ctrl-C so only the parent is interrupted"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _worker(pdf_path):
+    """Process one PDF in a worker; errors come back as a result dict"""
+    try:
+        return process_single_pdf(pdf_path)
+    except KeyboardInterrupt:
+        # Catch KeyboardInterrupt from problematic PDFs in pdfplumber
+        return {
+            "pdf_path": str(pdf_path),
+            "status": "failed",
+            "error": "keyboard_interrupt_from_pdfplumber"
+        }
+    except Exception as e:
+        return {
+            "pdf_path": str(pdf_path),
+            "error": str(e)
+        }
+
+
+def _report_summary(results: dict) -> None:
+    """Print the batch summary and save it to the summary JSON file"""
+    # Print summary
+    print("\n" + "="*80)
+    print("BATCH PROCESSING SUMMARY")
+    print("="*80)
+    print(f"Total PDFs: {sum(len(bucket) for bucket in results.values())}")
+    print(f"Successfully processed: {len(results['success'])}")
+    print(f"Skipped (already done): {len(results['skipped'])}")
+    print(f"Failed: {len(results['failed'])}")
+    print(f"Timeout: {len(results['timeout'])}")
+    
+    # Save summary to JSON
+    summary_file = LOGS_DIR / "batch_summary_15companies.json"
+    
+    # Written atomically so a Ctrl-C mid-write never leaves a truncated summary
+    write_file_atomic(summary_file, orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    
+    print(f"\nSummary saved to: {summary_file}")
+    
+    # List timeout/failed companies
+    if results["timeout"]:
+        print("\nTimed out:")
+        for r in results["timeout"]:
+            print(f"  - {r.get('company', 'Unknown')}: {Path(r['pdf_path']).name}")
+    
+    if results["failed"]:
+        print("\nFailed:")
+        for r in results["failed"]:
+            print(f"  - {r.get('company', 'Unknown')}: {Path(r['pdf_path']).name}")
+            if "error" in r:
+                print(f"    Error: {r['error']}")
+
+
 def main():
     """Process first 50 companies (by number prefix), focusing on 15 unprocessed ones"""
     
     # Get all company directories
     all_companies = [d for d in DATA_DIR.iterdir() if d.is_dir()]
     
-    # Sort by number prefix
-    all_companies_sorted = sorted(all_companies, key=lambda d: extract_number_from_company_name(d.name))
+    # Sort by number prefix, parsing each folder's number once
+    numbered = sorted(
+        ((extract_number_from_company_name(d.name), d) for d in all_companies),
+        key=lambda t: t[0]
+    )
     
     # Get first 50 by number
-    companies_1_to_50 = []
-    for company in all_companies_sorted:
-        num = extract_number_from_company_name(company.name)
-        if 1 <= num <= 50:
-            companies_1_to_50.append(company)
+    companies_1_to_50 = [company for num, company in numbered if 1 <= num <= 50]
     
     print(f"Found {len(companies_1_to_50)} companies numbered 1-50")
     
@@ -71,17 +230,11 @@ def main():
     unprocessed = [c for c in companies_1_to_50 if c.name not in processed]
     print(f"Unprocessed: {len(unprocessed)} companies")
     
-    # Limit to 15 unprocessed companies
-    companies_to_process = unprocessed[:15]
-    print(f"\nWill process {len(companies_to_process)} companies")
-    
-    # Collect all PDFs from selected companies (recursively)
-    pdf_files = []
-    for company_dir in companies_to_process:
-        pdfs = list(company_dir.rglob("*.pdf"))  # Recursive glob
-        pdf_files.extend(pdfs)
-    
-    print(f"Total PDFs to process: {len(pdf_files)}")
+    # PDFs attempted by earlier runs (including failures) are not retried,
+    # and their results are carried into this run's summary
+    attempted = _load_progress()
+    if attempted:
+        print(f"Already attempted: {len(attempted)} PDFs (listed in {PROGRESS_FILE.name})")
     
     # Process PDFs with progress bar
     results = {
@@ -90,83 +243,86 @@ def main():
         "skipped": [],
         "timeout": []
     }
+    for result in attempted.values():
+        _bucket_result(results, result)
     
-    for i, pdf_path in enumerate(pdf_files, 1):
-        print(f"\n{'='*80}")
-        print(f"Processing file {i}/{len(pdf_files)}: {pdf_path.name}")
-        print(f"{'='*80}")
-        
-        try:
+    # Limit to 15 unprocessed companies
+    companies_to_process = unprocessed[:15]
+    
+    # Collect the PDFs still to attempt from the selected companies (recursively)
+    to_process = []
+    for company_dir in companies_to_process:
+        for pdf_path in _scan_pdfs(str(company_dir)):
+            if pdf_path in attempted:
+                continue
+            
             # Skip known problematic PDFs temporarily
-            if "3M India Ltd" in pdf_path.name and ("2019_20" in pdf_path.name or "2020_21" in pdf_path.name):
-                print(f"  Skipping known problematic file: {pdf_path.name}")
+            pdf_name = os.path.basename(pdf_path)
+            if KNOWN_PROBLEMATIC_RE.match(pdf_name):
+                print(f"  Skipping known problematic file: {pdf_name}")
                 results["skipped"].append({
-                    "pdf_path": str(pdf_path),
+                    "pdf_path": pdf_path,
                     "status": "skipped",
                     "reason": "known_problematic_file"
                 })
                 continue
             
-            result = process_single_pdf(pdf_path)
-            status = result.get("status", "failed")
-            
-            if status == "success":
-                results["success"].append(result)
-            elif status == "skipped":
-                results["skipped"].append(result)
-            elif "timeout" in result.get("error", ""):
-                results["timeout"].append(result)
-            else:
-                results["failed"].append(result)
-        
-        except KeyboardInterrupt:
-            # Catch KeyboardInterrupt from problematic PDFs in pdfplumber
-            print(f"  ⚠ PDF caused interrupt (problematic): {pdf_path.name}")
-            results["failed"].append({
-                "pdf_path": str(pdf_path),
-                "status": "failed",
-                "error": "keyboard_interrupt_from_pdfplumber"
-            })
-            continue
-                
-        except Exception as e:
-            print(f"  ❌ Unexpected error: {e}")
-            results["failed"].append({
-                "pdf_path": str(pdf_path),
-                "error": str(e)
-            })
-    
-    # Print summary
-    print("\n" + "="*80)
-    print("BATCH PROCESSING SUMMARY")
-    print("="*80)
-    print(f"Total PDFs: {len(pdf_files)}")
-    print(f"Successfully processed: {len(results['success'])}")
-    print(f"Skipped (already done): {len(results['skipped'])}")
-    print(f"Failed: {len(results['failed'])}")
-    print(f"Timeout: {len(results['timeout'])}")
+            # Path objects are only built for the PDFs to process
+            to_process.append(Path(pdf_path))
     
-    # Save summary to JSON
-    summary_file = Path(__file__).parent.parent / "config" / "logs" / "batch_summary_15companies.json"
-    summary_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(summary_file, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"\nSummary saved to: {summary_file}")
+    print(f"\nWill process {len(companies_to_process)} companies")
+    print(f"Total PDFs to process: {len(to_process)}")
     
-    # List timeout/failed companies
-    if results["timeout"]:
-        print("\nTimed out:")
-        for r in results["timeout"]:
-            print(f"  - {r.get('company', 'Unknown')}: {Path(r['pdf_path']).name}")
+    # PDFs are parsed independently and the work is CPU-bound, so run them
+    # in worker processes and bucket the results as each one finishes
+    executor = ProcessPoolExecutor(
+        max_workers=MAX_WORKERS,
+        mp_context=worker_context(),
+        initializer=_init_worker
+    )
+    # Unbuffered, so each result reaches the file in a single write
+    progress_file = open(PROGRESS_FILE, 'ab', buffering=0)
+    try:
+        futures = {executor.submit(_worker, pdf_path): pdf_path for pdf_path in to_process}
+        
+        # Workers take PDFs in submission order; keep the reads for the next
+        # PDF of each worker ahead of the parsing
+        prefetch_ahead = 2 * MAX_WORKERS
+        for pdf_path in to_process[:prefetch_ahead]:
+            _prefetch(pdf_path)
+        
+        # tqdm redraws at most twice a second instead of printing per file
+        completed = tqdm(as_completed(futures), total=len(to_process), desc="Processing PDFs", unit="file", mininterval=0.5)
+        for i, future in enumerate(completed, 1):
+            if i + prefetch_ahead - 1 < len(to_process):
+                _prefetch(to_process[i + prefetch_ahead - 1])
+            
+            pdf_path = futures[future]
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. a crash in a PDF library)
+                tqdm.write(f"  ❌ Unexpected error in {pdf_path.name}: {e}")
+                result = {
+                    "pdf_path": str(pdf_path),
+                    "error": str(e)
+                }
+            
+            _bucket_result(results, result)
+            progress_file.write(orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+    except KeyboardInterrupt:
+        print("\nInterrupted - cancelling remaining PDFs")
+        print(f"Finished PDFs are recorded in {PROGRESS_FILE}; run again to resume")
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Report the PDFs finished so far before stopping
+        _report_summary(results)
+        raise
+    finally:
+        executor.shutdown()
+        progress_file.close()
     
-    if results["failed"]:
-        print("\nFailed:")
-        for r in results["failed"]:
-            print(f"  - {r.get('company', 'Unknown')}: {Path(r['pdf_path']).name}")
-            if "error" in r:
-                print(f"    Error: {r['error']}")
+    _report_summary(results)
 
 
 if __name__ == "__main__":
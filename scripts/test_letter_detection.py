@@ -1,9 +1,11 @@
 """Quick test of letter detection on reports that previously failed"""
 from pathlib import Path
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pipeline.section_boundary_detector import SectionBoundaryDetector
+from scripts._debug_common import cached_layout_detector
 
 pdfs = [
     'data/(1) 360 ONE WAM LTD.-20251230T101729Z-1-001/(1) 360 ONE WAM LTD/1_360 ONE WAM LTD._2019_20.pdf',
@@ -16,8 +18,8 @@ for pdf_str in pdfs:
     if not pdf.exists():
         continue
     print(f'\n{pdf.name}:')
-    detector = SectionBoundaryDetector(pdf)
-    detector.extract_layout_metadata()
+    # Layout metadata is reused from earlier runs while the PDF is unchanged
+    detector = cached_layout_detector(pdf)
     boundaries = detector.detect_section_boundaries()
     letter = boundaries.get('letter_to_stakeholders')
     if letter:
@@ -4,8 +4,9 @@ Compare text extraction between PDF and generated DOCX to validate completeness.
 import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pdfplumber
 from docx import Document
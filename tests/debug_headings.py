@@ -2,58 +2,76 @@
 Debug script to see what headings are in the first 20 pages.
 """
 import sys
+from collections import Counter
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pdfplumber
 
+
+def median_font_size(words):
+    """
+    Upper median of the word heights, same as sorted(heights)[len // 2].
+    
+    A page uses only a handful of distinct heights, so counting them and
+    walking the sorted distinct values is cheaper than sorting every word.
+    """
+    counts = Counter(w.get('height', 10) for w in words)
+    middle = len(words) // 2
+    seen = 0
+    for size in sorted(counts):
+        seen += counts[size]
+        if seen > middle:
+            return size
+    return 10
+
+
+def print_heading(page_num, line_words):
+    """Print a candidate heading line unless it is too long to be one"""
+    line_text = ' '.join(line_words)
+    if len(line_text) < 120:
+        print(f"\nPage {page_num + 1}:")
+        print(f"  '{line_text}'")
+
+
 pdf_path = Path(r"data\(17) Adani Green Energy Ltd.-20251230T103344Z-1-001\(17) Adani Green Energy Ltd\17_Adani Green Energy Ltd._2019_20.pdf")
 
 print("Analyzing first 20 pages for potential headings...")
 print("="*80)
 
-with pdfplumber.open(pdf_path) as pdf:
-    for page_num in range(min(20, len(pdf.pages))):
-        page = pdf.pages[page_num]
+# Only the first 20 pages get Page objects; the rest are never built
+with pdfplumber.open(pdf_path, pages=range(1, 21)) as pdf:
+    for page_num, page in enumerate(pdf.pages):
         words = page.extract_words(x_tolerance=3, y_tolerance=3)
+        # The words are all that's needed; drop the page's cached chars
+        page.close()
         
         if not words:
             continue
         
         # Calculate median font size
-        font_sizes = [w.get('height', 10) for w in words]
-        median_font = sorted(font_sizes)[len(font_sizes) // 2] if font_sizes else 10
+        median_font = median_font_size(words)
         
-        # Find large text at top of page
-        prominent_text = []
+        # Find large text at top of page and group it by y-position into
+        # lines as we go; extract_words returns words in reading order
+        current_line = []
+        current_y = None
         for word in words:
-            if word['top'] < 250 and word.get('height', 0) > median_font * 1.1:
-                prominent_text.append((word['text'], word['top'], word.get('height', 0)))
-        
-        if prominent_text:
-            # Group by y-position to form lines
-            prominent_text.sort(key=lambda x: x[1])
-            current_line = [prominent_text[0][0]]
-            current_y = prominent_text[0][1]
+            if word['top'] >= 250 or word.get('height', 0) <= median_font * 1.1:
+                continue
             
-            for text, y, size in prominent_text[1:]:
-                if abs(y - current_y) <= 3:
-                    current_line.append(text)
-                else:
-                    if current_line:
-                        line_text = ' '.join(current_line)
-                        if len(line_text) < 120:
-                            print(f"\nPage {page_num + 1}:")
-                            print(f"  '{line_text}'")
-                    current_line = [text]
-                    current_y = y
-            
-            if current_line:
-                line_text = ' '.join(current_line)
-                if len(line_text) < 120:
-                    print(f"\nPage {page_num + 1}:")
-                    print(f"  '{line_text}'")
+            if current_y is not None and abs(word['top'] - current_y) <= 3:
+                current_line.append(word['text'])
+            else:
+                if current_line:
+                    print_heading(page_num, current_line)
+                current_line = [word['text']]
+                current_y = word['top']
+        
+        if current_line:
+            print_heading(page_num, current_line)
 
 print("\n" + "="*80)
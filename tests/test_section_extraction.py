@@ -1,14 +1,32 @@
 """
 Test script for section extraction on a single PDF.
 """
+import os
 import sys
 from pathlib import Path
+import orjson
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path (not needed when run with python -m)
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from main import process_single_pdf
 
+
+def count_files(root):
+    """Count entries under root with an extension, like len(list(root.rglob("*.*")))"""
+    count = 0
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if "." in entry.name:
+                    count += 1
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return count
+
+
 # Test with Adani Green Energy 2019 report
 pdf_path = Path(r"data\(17) Adani Green Energy Ltd.-20251230T103344Z-1-001\(17) Adani Green Energy Ltd\17_Adani Green Energy Ltd._2019_20.pdf")
 
@@ -23,8 +41,7 @@ if result["status"] == "success":
     output_dir = Path(result["output_directory"])
     
     # Check what was created
-    all_files = list(output_dir.rglob("*.*"))
-    print(f"Files created: {len(all_files)}")
+    print(f"Files created: {count_files(output_dir)}")
     
     # Check section files specifically
     section_dir = output_dir / "sections"
@@ -41,20 +58,20 @@ if result["status"] == "success":
         # Show metadata
         metadata_file = section_dir / "sections_metadata.json"
         if metadata_file.exists():
-            import json
-            with open(metadata_file, encoding='utf-8') as f:
-                metadata = json.load(f)
-            print("\nSection detection results:")
+            metadata = orjson.loads(metadata_file.read_bytes())
+            # Built up and printed in one call rather than a print per line
+            lines = ["\nSection detection results:"]
             for section_key, data in metadata.items():
                 if data.get('extracted'):
                     boundary = data['boundary']
                     stats = data['content_stats']
-                    print(f"  [OK] {section_key}:")
-                    print(f"      Pages: {boundary['start_page']}-{boundary['end_page']}")
-                    print(f"      Confidence: {boundary['confidence']:.2f}")
-                    print(f"      Characters: {stats['character_count']:,}")
+                    lines.append(f"  [OK] {section_key}:")
+                    lines.append(f"      Pages: {boundary['start_page']}-{boundary['end_page']}")
+                    lines.append(f"      Confidence: {boundary['confidence']:.2f}")
+                    lines.append(f"      Characters: {stats['character_count']:,}")
                 else:
-                    print(f"  [X] {section_key}: Not found")
+                    lines.append(f"  [X] {section_key}: Not found")
+            print("\n".join(lines))
 else:
     print(f"STATUS: failed - {result.get('error')}")
 print("="*80)